@@ -0,0 +1,204 @@
+"""Cada motor de simulación debe coincidir con TuringMachine.simulate.
+
+Se recorre Σ^≤n de los ejemplos incluidos, con y sin δ estricta y con varios
+límites de pasos (para cubrir también las cadenas cortadas).
+"""
+import itertools
+
+import pytest
+
+from turing_simulator import (
+    EXAMPLES, ConfigurationMemo, MachineRun, TraceReader, build_turing_machine_from_yaml,
+    load_snapshot, record_trace, save_snapshot, simulate_batch_numpy, simulate_compiled,
+    simulate_memoized, _is_blank,
+)
+
+# Cadenas de movimientos S (se fusionan al compilar) y un ciclo S sin fin con 'b'
+STATIONARY_YAML = """q_states:
+  q_list:
+    - 'q0'
+    - 'q1'
+    - 'q2'
+    - 'qf'
+  initial: 'q0'
+  final: 'qf'
+alphabet:
+  - a
+  - b
+tape_alphabet:
+  - a
+  - b
+  - X
+  -
+delta:
+  - params:
+      initial_state: 'q0'
+      mem_cache_value:
+      tape_input: a
+    output:
+      final_state: 'q1'
+      mem_cache_value:
+      tape_output: X
+      tape_displacement: S
+  - params:
+      initial_state: 'q1'
+      mem_cache_value:
+      tape_input: X
+    output:
+      final_state: 'q2'
+      mem_cache_value: a
+      tape_output: X
+      tape_displacement: S
+  - params:
+      initial_state: 'q2'
+      mem_cache_value: a
+      tape_input: X
+    output:
+      final_state: 'q0'
+      mem_cache_value:
+      tape_output: a
+      tape_displacement: R
+  - params:
+      initial_state: 'q0'
+      mem_cache_value:
+      tape_input: b
+    output:
+      final_state: 'q1'
+      mem_cache_value:
+      tape_output: b
+      tape_displacement: S
+  - params:
+      initial_state: 'q1'
+      mem_cache_value:
+      tape_input: b
+    output:
+      final_state: 'q0'
+      mem_cache_value:
+      tape_output: b
+      tape_displacement: S
+  - params:
+      initial_state: 'q0'
+      mem_cache_value:
+      tape_input:
+    output:
+      final_state: 'qf'
+      mem_cache_value:
+      tape_output:
+      tape_displacement: S
+"""
+
+MAX_LENGTH = 4
+STEP_LIMITS = (1, 7, 1000)
+
+
+def _machines():
+    for name, yaml_content in EXAMPLES.items():
+        for strict_mode in (False, True):
+            tm, _, _ = build_turing_machine_from_yaml(yaml_content, strict_mode=strict_mode)
+            yield pytest.param(tm, id=f"{name.split(':')[0]}{' estricta' if strict_mode else ''}")
+    tm, _, _ = build_turing_machine_from_yaml(STATIONARY_YAML)
+    yield pytest.param(tm, id="Cadenas S")
+
+
+MACHINES = list(_machines())
+
+
+def _strings(tm):
+    alphabet = list(tm.input_alphabet)
+    return ["".join(p) for n in range(MAX_LENGTH + 1) for p in itertools.product(alphabet, repeat=n)]
+
+
+def _config(description):
+    # (estado, cache, símbolos sin blancos en los extremos, cabezal relativo al primero)
+    cells = [None if _is_blank(x) else x for x in description.tape]
+    lo, hi = 0, len(cells)
+    while lo < hi and cells[lo] is None:
+        lo += 1
+    while hi > lo and cells[hi - 1] is None:
+        hi -= 1
+    head = description.head_position - lo if lo < hi else None
+    return description.state, description.mem_cache, tuple(cells[lo:hi]), head
+
+
+def _run_config(run):
+    state, mem_cache, cells, head = _config(run.snapshot())
+    # simulate termina con una ID "(SIN δ)" cuando no hay transición aplicable
+    return (f"{state} (SIN δ)" if run.no_transition else state), mem_cache, cells, head
+
+
+def _reference(tm, s, max_steps):
+    accepted, ids, _ = tm.simulate(s, max_steps)
+    return (accepted, len(ids) - 1), ids
+
+
+@pytest.mark.parametrize("tm", MACHINES)
+@pytest.mark.parametrize("sparse", [False, True], ids=["densa", "dispersa"])
+def test_compiled_run_matches_simulate(tm, sparse):
+    for max_steps in STEP_LIMITS:
+        for s in _strings(tm):
+            expected, ids = _reference(tm, s, max_steps)
+            run = MachineRun(tm, s, record_ids=False, sparse=sparse)
+            run.run_until(max_steps)
+            assert run.result() == expected, (s, max_steps)
+            assert _run_config(run) == _config(ids[-1]), (s, max_steps)
+            if not sparse:
+                assert simulate_compiled(tm, s, max_steps) == expected, (s, max_steps)
+
+
+@pytest.mark.parametrize("tm", MACHINES)
+def test_resumed_run_matches_simulate(tm):
+    for s in _strings(tm):
+        expected, ids = _reference(tm, s, 1000)
+        run = MachineRun(tm, s, record_ids=False)
+        while not run.halted and run.steps < 1000:
+            run.advance(min(3, 1000 - run.steps))
+        assert run.result() == expected, s
+        assert _run_config(run) == _config(ids[-1]), s
+
+
+@pytest.mark.parametrize("tm", MACHINES)
+def test_numpy_batch_matches_simulate(tm):
+    strings = _strings(tm)
+    for max_steps in STEP_LIMITS:
+        expected = [_reference(tm, s, max_steps)[0] for s in strings]
+        assert simulate_batch_numpy(tm, strings, max_steps) == expected, max_steps
+
+
+@pytest.mark.parametrize("tm", MACHINES)
+def test_memoized_matches_simulate(tm):
+    # Una sola tabla para todas las cadenas y límites, como en enumerate_language
+    memo = ConfigurationMemo()
+    for max_steps in STEP_LIMITS:
+        for s in _strings(tm):
+            assert simulate_memoized(tm, s, max_steps, memo) == _reference(tm, s, max_steps)[0], (s, max_steps)
+
+
+@pytest.mark.parametrize("tm", MACHINES)
+def test_trace_reader_round_trip(tm, tmp_path):
+    path = str(tmp_path / "run.trace")
+    for s in _strings(tm)[:20]:
+        expected, ids = _reference(tm, s, 1000)
+        assert record_trace(tm, s, path, 1000, keyframe_interval=2) == expected, s
+        with TraceReader(path) as reader:
+            # Como en simulate, len(reader) incluye la ID "(SIN δ)"
+            assert (reader.accepted, len(reader) - 1) == expected, s
+            for step, description in enumerate(ids):
+                assert _config(reader[step]) == _config(description), (s, step)
+
+
+@pytest.mark.parametrize("tm", MACHINES)
+@pytest.mark.parametrize("sparse", [False, True], ids=["densa", "dispersa"])
+def test_snapshot_round_trip(tm, sparse, tmp_path):
+    path = str(tmp_path / "run.snap")
+    for s in _strings(tm)[:20]:
+        expected, ids = _reference(tm, s, 1000)
+        for pause in (0, 2, expected[1]):
+            run = MachineRun(tm, s, record_ids=False, sparse=sparse)
+            run.run_until(pause)
+            save_snapshot(run, path)
+            loaded = load_snapshot(tm, path, sparse=sparse)
+            assert (loaded.steps, loaded.halted) == (run.steps, run.halted), (s, pause)
+            assert _run_config(loaded) == _run_config(run), (s, pause)
+            loaded.run_until(1000)
+            assert loaded.result() == expected, (s, pause)
+            assert _run_config(loaded) == _config(ids[-1]), (s, pause)
@@ -1,9 +1,29 @@
 import streamlit as st
 import graphviz
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator, Sequence, Callable, Union
 from dataclasses import dataclass
 from enum import Enum
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from collections import deque
+import argparse
+import asyncio
+import itertools
+import threading
+import time
+import bisect
+import csv
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import hashlib
+import random
+import signal
+from array import array
 import pandas as pd
+import numpy as np
 
 # --- helpers de blanks y formato ---
 from typing import Set
@@ -11,6 +31,10 @@ from typing import Set
 def _is_blank(x: Optional[str]) -> bool:
     return x in (None, "", " ", "B")
 
+def _normalize_symbol(x: Optional[str]) -> Optional[str]:
+    # Misma normalización que las claves de δ: cualquier blanco es None
+    return None if _is_blank(x) else str(x)
+
 def _B(x: Optional[str]) -> str:
     return "B" if x is None else str(x)
 
@@ -20,7 +44,8 @@ def validate_machine(states: List[str],
                      input_alphabet: List[str],
                      tape_alphabet: List[Optional[str]],
                      transitions: List['Transition'],
-                     simulation_strings: List[str]) -> List[str]:
+                     simulation_strings: List[str],
+                     nondeterministic: bool = False) -> List[str]:
     issues: List[str] = []
 
     # 0) Estado inicial/final y duplicados de estados
@@ -53,9 +78,9 @@ def validate_machine(states: List[str],
         if t.output.tape_output not in tape_set and not _is_blank(t.output.tape_output):
             issues.append(f"tape_output '{t.output.tape_output}' no está en tape_alphabet")
 
-    # 3) Duplicadas
+    # 3) Duplicadas (en modo no determinista son opciones, no errores)
     seen: Set[Tuple[str, Optional[str], Optional[str]]] = set()
-    for t in transitions:
+    for t in ([] if nondeterministic else transitions):
         key = (t.params.initial_state,
                None if _is_blank(t.params.mem_cache_value) else t.params.mem_cache_value,
                None if _is_blank(t.params.tape_input) else t.params.tape_input)
@@ -65,11 +90,10 @@ def validate_machine(states: List[str],
             seen.add(key)
 
     # 4) Cadenas vs alphabet
-    in_set: Set[str] = set(input_alphabet)
     for s in simulation_strings:
-        bad = [c for c in s if c not in in_set]
+        bad = invalid_symbols(input_alphabet, s)
         if bad:
-            issues.append(f"Cadena '{s}' contiene símbolos fuera de alphabet: {set(bad)}")
+            issues.append(f"Cadena '{s}' contiene símbolos fuera de alphabet: {bad}")
 
     # 5) El blanco (None/B) DEBE estar en tape_alphabet (se permite como '-')
     if None not in tape_set:
@@ -242,8 +266,13 @@ class Direction(Enum):
     STAY = 'S'
 
 
+_MOVE_DELTA = {Direction.LEFT: -1, Direction.RIGHT: 1, Direction.STAY: 0}
+
+
 @dataclass
 class TransitionParams:
+    __slots__ = ('initial_state', 'mem_cache_value', 'tape_input')
+
     initial_state: str
     mem_cache_value: Optional[str]
     tape_input: Optional[str]
@@ -251,6 +280,8 @@ class TransitionParams:
 
 @dataclass
 class TransitionOutput:
+    __slots__ = ('final_state', 'mem_cache_value', 'tape_output', 'tape_displacement')
+
     final_state: str
     mem_cache_value: Optional[str]
     tape_output: Optional[str]
@@ -259,6 +290,8 @@ class TransitionOutput:
 
 @dataclass
 class Transition:
+    __slots__ = ('params', 'output')
+
     params: TransitionParams
     output: TransitionOutput
     
@@ -273,6 +306,8 @@ class Transition:
 
 @dataclass
 class InstantaneousDescription:
+    __slots__ = ('state', 'tape', 'head_position', 'mem_cache', 'step')
+
     state: str
     tape: List[Optional[str]]
     head_position: int
@@ -320,6 +355,328 @@ class InstantaneousDescription:
         )
         return tape_html
 
+class PackedDescription(InstantaneousDescription):
+    """ID con la cinta en códigos de símbolo (array); `tape` se decodifica al leerla.
+
+    Copiar la cinta al registrar la ID es una copia de memoria de 1–2 bytes
+    por celda; la conversión a símbolos solo ocurre al mostrar o exportar.
+    """
+    __slots__ = ('codes', 'symbols')
+
+    def __init__(self, state: str, codes: array, symbols: List[Optional[str]],
+                 head_position: int, mem_cache: Optional[str], step: int):
+        self.state = state
+        self.codes = codes
+        self.symbols = symbols
+        self.head_position = head_position
+        self.mem_cache = mem_cache
+        self.step = step
+
+    @property
+    def tape(self) -> List[Optional[str]]:
+        symbols = self.symbols
+        return [symbols[c] for c in self.codes]
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (PackedDescription, (self.state, self.codes, self.symbols,
+                                    self.head_position, self.mem_cache, self.step))
+
+
+class SymbolCodec:
+    """Símbolos de cinta internados como enteros pequeños; el blanco es el código 0.
+
+    Solo crece (agregando los símbolos nuevos de cada entrada), así que los
+    códigos ya entregados nunca cambian.
+    """
+
+    def __init__(self, symbols: Iterable[Optional[str]] = ()):
+        self.symbols: List[Optional[str]] = [None]
+        self.codes: Dict[Optional[str], int] = {None: 0}
+        self._lock = threading.Lock()
+        for sym in symbols:
+            self.code(sym)
+
+    def code(self, symbol: Optional[str]) -> int:
+        code = self.codes.get(symbol)
+        if code is None:
+            with self._lock:
+                code = self.codes.get(symbol)
+                if code is None:
+                    code = len(self.symbols)
+                    self.symbols.append(symbol)
+                    self.codes[symbol] = code
+        return code
+
+    @property
+    def typecode(self) -> str:
+        # 'B' (1 byte por celda) mientras el alfabeto quepa; si no, 'H' (2 bytes)
+        return 'B' if len(self.symbols) <= 256 else 'H'
+
+    def encode(self, cells: Iterable[Optional[str]]) -> array:
+        codes = [self.code(x) for x in cells]
+        return array(self.typecode, codes)
+
+    def decode(self, codes: Iterable[int]) -> List[Optional[str]]:
+        symbols = self.symbols
+        return [symbols[c] for c in codes]
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"symbols": self.symbols, "codes": self.codes}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.symbols = state["symbols"]
+        self.codes = state["codes"]
+        self._lock = threading.Lock()
+
+
+class PagedTape:
+    """Cinta dispersa: páginas de tamaño fijo en un dict indexado por número de página.
+
+    Las posiciones son absolutas (pueden ser negativas). Una página se reserva
+    con la primera escritura no blanca y se libera cuando vuelve a quedar toda
+    en blanco, así que la memoria depende de las celdas tocadas y no de la
+    distancia recorrida por el cabezal.
+    """
+
+    def __init__(self, typecode: str = 'B', page_size: int = 256,
+                 pages: Optional[Dict[int, array]] = None):
+        if page_size <= 0:
+            raise ValueError("El tamaño de página debe ser positivo")
+        self.typecode = typecode
+        self.page_size = page_size
+        self.pages: Dict[int, array] = pages if pages is not None else {}
+        # Celdas no blancas por página (para liberar las páginas vacías)
+        self.counts: Dict[int, int] = {
+            n: len(page) - page.count(0) for n, page in self.pages.items()
+        }
+
+    @classmethod
+    def from_codes(cls, codes: Iterable[int], typecode: str, page_size: int = 256,
+                   start: int = 0) -> 'PagedTape':
+        tape = cls(typecode, page_size)
+        if not isinstance(codes, array) or codes.typecode != typecode:
+            codes = array(typecode, codes)
+        # Alinear al inicio de página y cortar por rebanadas (sin recorrer celda a celda)
+        first, pad = divmod(start, page_size)
+        if pad:
+            codes = array(typecode, bytes(pad * codes.itemsize)) + codes
+        for k in range(0, len(codes), page_size):
+            page = codes[k:k + page_size]
+            nonblank = len(page) - page.count(0)
+            if nonblank:
+                if len(page) < page_size:
+                    page.frombytes(bytes((page_size - len(page)) * page.itemsize))
+                tape.pages[first + k // page_size] = page
+                tape.counts[first + k // page_size] = nonblank
+        return tape
+
+    def new_page(self, number: int) -> array:
+        page = array(self.typecode, bytes(self.page_size * array(self.typecode).itemsize))
+        self.pages[number] = page
+        self.counts[number] = 0
+        return page
+
+    def __getitem__(self, position: int) -> int:
+        number, i = divmod(position, self.page_size)
+        page = self.pages.get(number)
+        return page[i] if page is not None else 0
+
+    def __setitem__(self, position: int, code: int) -> None:
+        number, i = divmod(position, self.page_size)
+        page = self.pages.get(number)
+        if page is None:
+            if not code:
+                return
+            page = self.new_page(number)
+        old = page[i]
+        page[i] = code
+        if old and not code:
+            self.counts[number] -= 1
+            if not self.counts[number]:
+                del self.pages[number]
+                del self.counts[number]
+        elif code and not old:
+            self.counts[number] += 1
+
+    @property
+    def touched_cells(self) -> int:
+        """Celdas no blancas actualmente en la cinta."""
+        return sum(self.counts.values())
+
+    @property
+    def allocated_cells(self) -> int:
+        return len(self.pages) * self.page_size
+
+    def extents(self) -> List[Tuple[int, array]]:
+        """Tramos contiguos de celdas no blancas como (posición inicial, códigos)."""
+        size = self.page_size
+        runs: List[Tuple[int, array]] = []
+        for number in sorted(self.pages):
+            page = self.pages[number]
+            base = number * size
+            i = 0
+            while i < size:
+                if not page[i]:
+                    i += 1
+                    continue
+                j = i + 1
+                while j < size and page[j]:
+                    j += 1
+                start = base + i
+                if runs and runs[-1][0] + len(runs[-1][1]) == start:
+                    runs[-1][1].extend(page[i:j])
+                else:
+                    runs.append((start, page[i:j]))
+                i = j
+        return runs
+
+    def bounds(self) -> Optional[Tuple[int, int]]:
+        """Primera y última posición no blanca, o None si la cinta está en blanco."""
+        if not self.pages:
+            return None
+        size = self.page_size
+        first, last = min(self.pages), max(self.pages)
+        lo_page, hi_page = self.pages[first], self.pages[last]
+        lo = next(i for i in range(size) if lo_page[i])
+        hi = next(i for i in range(size - 1, -1, -1) if hi_page[i])
+        return first * size + lo, last * size + hi
+
+    def window(self, head_position: int) -> Tuple[array, int]:
+        """Vista densa de los extremos no blancos y el cabezal: (códigos, offset).
+
+        Igual que en MachineRun, posición absoluta = índice - offset.
+        """
+        bounds = self.bounds()
+        lo, hi = bounds if bounds is not None else (head_position, head_position)
+        lo, hi = min(lo, head_position), max(hi, head_position)
+        size = self.page_size
+        codes = array(self.typecode)
+        position = lo
+        while position <= hi:
+            number, i = divmod(position, size)
+            take = min(size - i, hi - position + 1)
+            page = self.pages.get(number)
+            if page is not None:
+                codes.extend(page[i:i + take])
+            else:
+                codes.extend(array(self.typecode, bytes(take * codes.itemsize)))
+            position += take
+        return codes, -lo
+
+    def freeze(self) -> 'PagedTape':
+        """Copia de solo lectura que comparte las páginas actuales (ver MachineRun)."""
+        frozen = PagedTape.__new__(PagedTape)
+        frozen.typecode = self.typecode
+        frozen.page_size = self.page_size
+        frozen.pages = dict(self.pages)
+        frozen.counts = {}
+        return frozen
+
+
+class SparseDescription(InstantaneousDescription):
+    """ID sobre una cinta dispersa; solo se muestran los tramos no blancos.
+
+    Los huecos largos de blancos se resumen en una sola celda "⋯ n ⋯".
+    `tape` y `head_position` dan la vista densa equivalente (entre el primer
+    símbolo no blanco y el último, incluyendo el cabezal).
+    """
+    __slots__ = ('cells', 'symbols', 'head_absolute')
+
+    # Huecos de blancos más cortos que esto se muestran celda por celda
+    GAP = 4
+
+    def __init__(self, state: str, cells: PagedTape, symbols: List[Optional[str]],
+                 head_absolute: int, mem_cache: Optional[str], step: int):
+        self.state = state
+        self.cells = cells
+        self.symbols = symbols
+        self.head_absolute = head_absolute
+        self.mem_cache = mem_cache
+        self.step = step
+
+    @property
+    def tape(self) -> List[Optional[str]]:
+        codes, _ = self.cells.window(self.head_absolute)
+        symbols = self.symbols
+        return [symbols[c] for c in codes]
+
+    @property
+    def head_position(self) -> int:
+        _, offset = self.cells.window(self.head_absolute)
+        return self.head_absolute + offset
+
+    def segments(self) -> Iterator[Tuple[Optional[int], int, bool]]:
+        """Recorre la cinta por tramos: (código, posición, es_cabezal) o (None, blancos, False)."""
+        head = self.head_absolute
+        runs = self.cells.extents()
+        # El cabezal sobre un blanco aislado se agrega como tramo propio
+        k = bisect.bisect_right([start for start, _ in runs], head)
+        if k == 0 or head >= runs[k - 1][0] + len(runs[k - 1][1]):
+            runs.insert(k, (head, array(self.cells.typecode, [0])))
+        end = None
+        for start, codes in runs:
+            if end is not None and start > end:
+                if start - end < self.GAP:
+                    yield from ((0, p, False) for p in range(end, start))
+                else:
+                    yield None, start - end, False
+            for p, c in enumerate(codes, start):
+                yield c, p, p == head
+            end = start + len(codes)
+
+    def __str__(self) -> str:
+        symbols = self.symbols
+        tape_str = ""
+        for code, p, is_head in self.segments():
+            if code is None:
+                tape_str += f"…({p} B)…"
+                continue
+            sym = symbols[code] if symbols[code] is not None else 'B'
+            tape_str += f"[{self.state}]({sym})" if is_head else sym
+        cache_str = f", Cache: {self.mem_cache if self.mem_cache else 'B'}"
+        return f"ID_{self.step}: {tape_str}{cache_str}"
+
+    def to_html(self) -> str:
+        base = (
+            "background:#000;color:#fff;padding:6px 10px;margin:2px;"
+            "border:1px solid #333;border-radius:4px;min-width:28px;"
+            "text-align:center;display:inline-block;font-family:monospace;"
+        )
+        head = base + "outline:3px solid #ffcc00;font-weight:bold;"
+        gap = base + "background:#222;color:#999;font-style:italic;"
+
+        symbols = self.symbols
+        tape_html = '<div style="display:flex;align-items:center;flex-wrap:wrap;">'
+        tape_html += '<span style="margin-right:10px;font-weight:bold;font-family:monospace;">Cinta:</span>'
+        for code, p, is_head in self.segments():
+            if code is None:
+                tape_html += f'<span style="{gap}">⋯ {p} B ⋯</span>'
+                continue
+            sym = symbols[code] if symbols[code] is not None else 'B'
+            tape_html += f'<span style="{head if is_head else base}">{sym}</span>'
+
+        cache_val = self.mem_cache if self.mem_cache else 'B'
+        tape_html += (
+            '</div>'
+            f'<div style="margin-top:10px;font-family:monospace;font-size:14px;">'
+            f'Estado: <strong>{self.state}</strong> | '
+            f'Cache: <strong>{cache_val}</strong> | '
+            f'Posición: <strong>{self.head_absolute}</strong>'
+            f'</div>'
+        )
+        return tape_html
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (SparseDescription, (self.state, self.cells, self.symbols,
+                                    self.head_absolute, self.mem_cache, self.step))
+
+
+# Transición compilada para el bucle de simulación:
+# (estado destino, cache, símbolo a escribir, Δcabezal, transición original)
+CompiledStep = Tuple[str, Optional[str], Optional[str], int, 'Transition']
+# Igual, pero con el símbolo a escribir como código de SymbolCodec
+CodedStep = Tuple[str, Optional[str], int, int, 'Transition']
+
 # ============================================================================
 # MÁQUINA DE TURING
 # ============================================================================
@@ -332,7 +689,8 @@ class TuringMachine:
                  input_alphabet: List[str],
                  tape_alphabet: List[str],
                  transitions: List[Transition],
-                 strict_mode: bool = False):
+                 strict_mode: bool = False,
+                 nondeterministic: bool = False):
         self.states = states
         self.initial_state = initial_state
         self.final_state = final_state
@@ -340,20 +698,47 @@ class TuringMachine:
         self.tape_alphabet = tape_alphabet
         self.transitions = transitions
         self.strict_mode = strict_mode
+        self.nondeterministic = nondeterministic
 
         # Índice determinista: una sola transición por (q, cache, tape)
         self.transition_map: Dict[Tuple[str, Optional[str], Optional[str]], Transition] = {}
         self.duplicates: List[Tuple[str, Optional[str], Optional[str]]] = []
+        # Todas las opciones por clave, en orden de definición (modo no determinista)
+        self.transition_options: Dict[Tuple[str, Optional[str], Optional[str]], List[Transition]] = {}
+        # Códigos de símbolo para la cinta compacta y δ resuelta sobre códigos
+        self.codec = SymbolCodec(
+            [x for x in list(tape_alphabet) + list(input_alphabet)] +
+            [x for t in transitions for x in (t.params.tape_input, t.output.tape_output,
+                                              t.params.mem_cache_value, t.output.mem_cache_value)]
+        )
+        self._code_step_table: Dict[Tuple[str, Optional[str], int], Optional[CodedStep]] = {}
+        # δ resuelta y precompilada por clave cruda (ver resolve_step)
+        self._step_table: Dict[Tuple[str, Optional[str], Optional[str]], Optional[CompiledStep]] = {}
+        self._fingerprint: Optional[str] = None
 
         for t in transitions:
             cache_key = None if _is_blank(t.params.mem_cache_value) else str(t.params.mem_cache_value)
             tape_key  = None if _is_blank(t.params.tape_input)      else str(t.params.tape_input)
             key = (t.params.initial_state, cache_key, tape_key)
+            self.transition_options.setdefault(key, []).append(t)
             if key in self.transition_map:
                 self.duplicates.append(key)
             else:
                 self.transition_map[key] = t
 
+    def fingerprint(self) -> str:
+        """Huella (SHA-256) de todo lo que determina el comportamiento de la MT."""
+        if self._fingerprint is None:
+            data = [self.states, self.initial_state, self.final_state, self.strict_mode,
+                    self.nondeterministic]
+            data += [(repr(t.params.initial_state), repr(t.params.mem_cache_value),
+                      repr(t.params.tape_input), repr(t.output.final_state),
+                      repr(t.output.mem_cache_value), repr(t.output.tape_output),
+                      t.output.tape_displacement.value)
+                     for t in self.transitions]
+            self._fingerprint = hashlib.sha256(repr(data).encode("utf-8")).hexdigest()
+        return self._fingerprint
+
     # Prioridad: exacta → (mem,B) → (B,tape) → (B,B)
     def _candidates(self, state: str, mem_cache: Optional[str], tape_symbol: Optional[str]):
         m = None if _is_blank(mem_cache)  else str(mem_cache)
@@ -375,79 +760,55 @@ class TuringMachine:
                 return tr
         return None
 
-    def simulate(self, input_string: str, max_steps: int = 10000) -> Tuple[bool, List[InstantaneousDescription], Optional[Transition]]:
-        # Inicializar cinta y cabezal
-        if input_string:
-            tape = [None] + list(input_string) + [None]
-            head_position = 1
-        else:
-            tape = [None]
-            head_position = 0
-
-        current_state = self.initial_state
-        mem_cache = None
-
-        ids: List[InstantaneousDescription] = [
-            InstantaneousDescription(
-                state=current_state,
-                tape=tape.copy(),
-                head_position=head_position,
-                mem_cache=mem_cache,
-                step=0
-            )
-        ]
-
-        steps = 0
-        last_transition: Optional[Transition] = None
-
-        while steps < max_steps:
-            if current_state == self.final_state:
-                return True, ids, last_transition
-
-            current_symbol = tape[head_position]
-            transition = self.find_transition(current_state, mem_cache, current_symbol)
-            if transition is None:
-                ids.append(InstantaneousDescription(
-                    state=f"{current_state} (SIN δ)",
-                    tape=tape.copy(),
-                    head_position=head_position,
-                    mem_cache=mem_cache,
-                    step=steps + 1
-                ))
-                return False, ids, last_transition
-
-            last_transition = transition
-            steps += 1
-
-            # Escribir y actualizar estado/cache
-            current_state = transition.output.final_state
-            mem_cache = transition.output.mem_cache_value
-            tape[head_position] = transition.output.tape_output
-
-            # Mover cabezal con extensión inmediata
-            if transition.output.tape_displacement == Direction.LEFT:
-                head_position -= 1
-                if head_position < 0:
-                    tape.insert(0, None)
-                    head_position = 0
-            elif transition.output.tape_displacement == Direction.RIGHT:
-                head_position += 1
-                if head_position >= len(tape):
-                    tape.append(None)
-            # STAY: no mover
-
-            ids.append(InstantaneousDescription(
-                state=current_state,
-                tape=tape.copy(),
-                head_position=head_position,
-                mem_cache=mem_cache,
-                step=steps
-            ))
-
-            if current_state == self.final_state:
-                return True, ids, last_transition
+    def resolve_step(self, state: str, mem_cache: Optional[str],
+                     tape_symbol: Optional[str]) -> Optional[CompiledStep]:
+        """find_transition ya compilada: (estado, cache, escritura, Δcabezal, transición).
+
+        El resultado se memoiza por la clave cruda (sin normalizar blancos), así
+        que tras el primer acceso el bucle de simulación hace un solo probe.
+        """
+        key = (state, mem_cache, tape_symbol)
+        try:
+            return self._step_table[key]
+        except KeyError:
+            pass
+        tr = self.find_transition(state, mem_cache, tape_symbol)
+        step = None if tr is None else (tr.output.final_state, tr.output.mem_cache_value,
+                                        tr.output.tape_output, _MOVE_DELTA[tr.output.tape_displacement], tr)
+        self._step_table[key] = step
+        return step
+
+    def resolve_coded_step(self, state: str, mem_cache: Optional[str],
+                           code: int) -> Optional[CodedStep]:
+        """Como resolve_step, pero leyendo y escribiendo códigos de SymbolCodec."""
+        key = (state, mem_cache, code)
+        try:
+            return self._code_step_table[key]
+        except KeyError:
+            pass
+        step = self.resolve_step(state, mem_cache, self.codec.symbols[code])
+        coded = None if step is None else \
+            (step[0], step[1], self.codec.code(step[2]), step[3], step[4])
+        self._code_step_table[key] = coded
+        return coded
+
+    def find_transitions(self, state: str, mem_cache: Optional[str],
+                         tape_symbol: Optional[str]) -> List[Transition]:
+        # Misma prioridad que find_transition, pero con todas las opciones de la clave
+        if self.strict_mode:
+            m = None if _is_blank(mem_cache)  else str(mem_cache)
+            t = None if _is_blank(tape_symbol) else str(tape_symbol)
+            return self.transition_options.get((state, m, t), [])
+        for k in self._candidates(state, mem_cache, tape_symbol):
+            options = self.transition_options.get(k)
+            if options:
+                return options
+        return []
 
-        return False, ids, last_transition
+    def simulate(self, input_string: str, max_steps: int = 10000) -> Tuple[bool, List[InstantaneousDescription], Optional[Transition]]:
+        run = MachineRun(self, input_string)
+        run.run_until(max_steps)
+        return run.accepted, run.ids, run.last_transition
 
     def to_graphviz(self) -> graphviz.Digraph:
         dot = graphviz.Digraph(comment='Máquina de Turing')
@@ -485,6 +846,916 @@ class TuringMachine:
 
         return dot
 
+_UNRESOLVED = object()
+
+
+class MachineRun:
+    """Ejecución reanudable de una MT sobre una cadena.
+
+    Conserva la configuración viva (estado, cache, cinta, cabezal, pasos) para
+    poder avanzar por tramos, pausar o cancelar entre tramos y continuar.
+    Con `sparse=True` la cinta es una PagedTape y `head_position` es absoluta.
+    """
+
+    def __init__(self, tm: TuringMachine, input_string: 'InputData', record_ids: bool = True,
+                 sparse: bool = False, page_size: int = 256, id_limit: Optional[int] = None):
+        self.tm = tm
+        self.sparse = sparse
+        # Huella SHA-256 de la entrada (solo para entradas en buffer, ver encode_input)
+        self.input_digest: Optional[str] = None
+
+        # Inicializar cinta (códigos de símbolo, blanco = 0) y cabezal
+        codec = tm.codec
+        if not isinstance(input_string, str):
+            # Buffer (bytes, mmap...): se decodifica en bloque, sin un str por símbolo
+            codes, self.input_digest = encode_input(tm, input_string)
+            self.input_string: Optional[str] = None
+            self.head_position = 1 if len(codes) > 1 else 0
+        elif input_string:
+            self.input_string = input_string
+            codes = [0] + [codec.code(c) for c in input_string] + [0]
+            self.head_position = 1
+        else:
+            self.input_string = input_string
+            codes = [0]
+            self.head_position = 0
+        self.symbols = codec.symbols
+        if sparse:
+            self.tape = PagedTape.from_codes(codes, codec.typecode, page_size)
+        elif isinstance(codes, array):
+            self.tape = codes
+        else:
+            self.tape = array(codec.typecode, codes)
+
+        self.state = tm.initial_state
+        self.mem_cache: Optional[str] = None
+        self.steps = 0
+        self.halted = False
+        self.accepted = False
+        self.no_transition = False
+        self.last_transition: Optional[Transition] = None
+        # Ciclo de movimientos S detectado por la función compilada (nunca se detiene)
+        self.stationary_loop = False
+        # Índice del último punto de parada alcanzado (ver run_to_breakpoint)
+        self.breakpoint_hit: Optional[int] = None
+        # Copia de una configuración anterior al último punto, para armar su ventana
+        self.breakpoint_origin: Optional['MachineRun'] = None
+        # Celdas insertadas a la izquierda: posición absoluta = índice - offset
+        self.offset = 0
+        # Escritor de traza binaria opcional (ver TraceWriter)
+        self.trace: Optional['TraceWriter'] = None
+        self.ids: Optional[List[InstantaneousDescription]] = None
+        # Máximo de IDs a registrar; al llegar, el resto corre sin registrar
+        self.id_limit = id_limit
+        self.ids_truncated = False
+        if record_ids:
+            self.ids = [self.snapshot()]
+
+    def snapshot(self) -> InstantaneousDescription:
+        if self.sparse:
+            return SparseDescription(
+                state=self.state,
+                cells=self.tape.freeze(),
+                symbols=self.symbols,
+                head_absolute=self.head_position,
+                mem_cache=self.mem_cache,
+                step=self.steps
+            )
+        return PackedDescription(
+            state=self.state,
+            codes=self.tape[:],
+            symbols=self.symbols,
+            head_position=self.head_position,
+            mem_cache=self.mem_cache,
+            step=self.steps
+        )
+
+    def copy(self) -> 'MachineRun':
+        """Copia independiente de la configuración viva, sin IDs ni traza."""
+        clone = MachineRun.__new__(MachineRun)
+        clone.__dict__.update(self.__dict__)
+        clone.tape = _copy_tape(self.tape)
+        clone.ids, clone.trace, clone.id_limit, clone.ids_truncated = None, None, None, False
+        clone.breakpoint_origin = None
+        return clone
+
+    def cells(self) -> List[Optional[str]]:
+        """Cinta actual decodificada a símbolos (solo para mostrar/exportar)."""
+        symbols = self.symbols
+        if self.sparse:
+            codes, _ = self.tape.window(self.head_position)
+            return [symbols[c] for c in codes]
+        return [symbols[c] for c in self.tape]
+
+    def extents(self) -> List[Tuple[int, List[Optional[str]]]]:
+        """Tramos no blancos de la cinta como (posición absoluta, símbolos)."""
+        symbols = self.symbols
+        if self.sparse:
+            runs = self.tape.extents()
+        else:
+            runs, start = [], None
+            for i, c in enumerate(self.tape):
+                if c and start is None:
+                    start = i
+                elif not c and start is not None:
+                    runs.append((start - self.offset, self.tape[start:i]))
+                    start = None
+            if start is not None:
+                runs.append((start - self.offset, self.tape[start:]))
+        return [(p, [symbols[c] for c in codes]) for p, codes in runs]
+
+    @property
+    def recorded_ids(self) -> Optional[List[InstantaneousDescription]]:
+        """Lista de IDs a la que aún se agregan pasos (None si no se registra o ya se llegó a id_limit)."""
+        return None if self.ids_truncated else self.ids
+
+    @property
+    def reported_steps(self) -> int:
+        # Igual que len(ids) - 1: el alto sin δ agrega una ID "(SIN δ)"
+        return self.steps + (1 if self.no_transition else 0)
+
+    def result(self) -> Tuple[bool, int]:
+        return self.accepted, self.reported_steps
+
+    def advance(self, n: int) -> bool:
+        """Ejecuta hasta n transiciones más; devuelve True si la MT se detuvo."""
+        return self.run_until(self.steps + n)
+
+    def run_until(self, max_steps: int) -> bool:
+        """Avanza hasta detenerse o hasta completar max_steps pasos en total."""
+        if self.halted:
+            return True
+        if self.ids is not None and self.id_limit is not None and not self.ids_truncated:
+            room = self.id_limit - len(self.ids)
+            if room <= max_steps - self.steps:
+                # Registrar hasta completar id_limit IDs; lo que sigue ya no se registra
+                if room > 0 and self._run_until(self.steps + room):
+                    return True
+                self.ids_truncated = True
+        return self._run_until(max_steps)
+
+    def _run_until(self, max_steps: int) -> bool:
+        if self.sparse:
+            return self._run_until_sparse(max_steps)
+        if self.recorded_ids is None and self.trace is None:
+            return self._run_until_compiled(max_steps)
+
+        tm = self.tm
+        final_state = tm.final_state
+        tape = self.tape
+        ids = self.recorded_ids
+        trace = self.trace
+        offset = self.offset
+        head_position = self.head_position
+        current_state = self.state
+        mem_cache = self.mem_cache
+        steps = self.steps
+        last_transition = self.last_transition
+
+        symbols = self.symbols
+        step_table = tm._code_step_table
+        resolve_step = tm.resolve_coded_step
+
+        while steps < max_steps:
+            if current_state == final_state:
+                self.halted = self.accepted = True
+                break
+
+            symbol = tape[head_position]
+            step = step_table.get((current_state, mem_cache, symbol), _UNRESOLVED)
+            if step is _UNRESOLVED:
+                step = resolve_step(current_state, mem_cache, symbol)
+            if step is None:
+                self.halted = self.no_transition = True
+                if ids is not None:
+                    ids.append(PackedDescription(
+                        state=f"{current_state} (SIN δ)",
+                        codes=tape[:],
+                        symbols=symbols,
+                        head_position=head_position,
+                        mem_cache=mem_cache,
+                        step=steps + 1
+                    ))
+                break
+
+            # Escribir y actualizar estado/cache
+            current_state, mem_cache, tape[head_position], delta, last_transition = step
+            steps += 1
+
+            # Mover cabezal con extensión inmediata (delta 0 = STAY)
+            if delta:
+                head_position += delta
+                if head_position < 0:
+                    tape.insert(0, 0)
+                    head_position = 0
+                    offset += 1
+                elif head_position >= len(tape):
+                    tape.append(0)
+
+            if ids is not None:
+                ids.append(PackedDescription(
+                    state=current_state,
+                    codes=tape[:],
+                    symbols=symbols,
+                    head_position=head_position,
+                    mem_cache=mem_cache,
+                    step=steps
+                ))
+            if trace is not None:
+                trace.record(last_transition, tape, offset, head_position)
+
+            if current_state == final_state:
+                self.halted = self.accepted = True
+                break
+
+        self.head_position = head_position
+        self.offset = offset
+        self.state = current_state
+        self.mem_cache = mem_cache
+        self.steps = steps
+        self.last_transition = last_transition
+        return self.halted
+
+    def run_to_breakpoint(self, breakpoints: Sequence['Breakpoint'], max_steps: int) -> Optional[int]:
+        """Avanza a toda velocidad hasta que se cumpla un punto de parada (índice) o la MT se detenga.
+
+        Los puntos de parada se evalúan después de cada transición, así que
+        llamar de nuevo continúa más allá del último punto alcanzado.
+        """
+        if self.recorded_ids is not None or self.trace is not None or self.sparse:
+            raise ValueError("Los puntos de parada requieren una ejecución sin IDs, sin traza y con cinta densa")
+        self.breakpoint_hit = None
+        if not self.halted:
+            self._run_until_compiled(max_steps, breakpoints)
+        return self.breakpoint_hit
+
+    def _run_until_compiled(self, max_steps: int, breakpoints: Sequence['Breakpoint'] = ()) -> bool:
+        """Igual que run_until, con la función generada por compile_machine (sin IDs ni traza)."""
+        compiled = compile_machine(self.tm, breakpoints)
+        status, state, cache, self.head_position, self.offset, self.steps, t = compiled.run(
+            self.tape, self.head_position, self.offset,
+            compiled.states.index(self.state), compiled.cache_values.index(self.mem_cache),
+            self.steps, max_steps)
+        self.state = compiled.states[state]
+        self.mem_cache = compiled.cache_values[cache]
+        if t >= 0:
+            self.last_transition = self.tm.transitions[t]
+        if status == _RUN_ACCEPTED:
+            self.halted = self.accepted = True
+        elif status == _RUN_NO_DELTA:
+            self.halted = self.no_transition = True
+        elif status == _RUN_STATIONARY_LOOP:
+            self.stationary_loop = True
+        elif status >= _RUN_BREAK:
+            self.breakpoint_hit = status - _RUN_BREAK
+        return self.halted
+
+    def _run_until_sparse(self, max_steps: int) -> bool:
+        """Igual que run_until, sobre la cinta por páginas.
+
+        Con IDs activas, cada ID comparte las páginas no modificadas con la
+        anterior (copia al escribir), así que registrar una ID cuesta una
+        página y no toda la distancia entre los extremos de la cinta.
+        """
+        tm = self.tm
+        final_state = tm.final_state
+        tape = self.tape
+        pages = tape.pages
+        counts = tape.counts
+        page_size = tape.page_size
+        ids = self.recorded_ids
+        trace = self.trace
+        head_position = self.head_position
+        current_state = self.state
+        mem_cache = self.mem_cache
+        steps = self.steps
+        last_transition = self.last_transition
+
+        symbols = self.symbols
+        step_table = tm._code_step_table
+        resolve_step = tm.resolve_coded_step
+        # Páginas propias de la ejecución (no compartidas con ninguna ID); tras
+        # llegar a id_limit las IDs ya registradas siguen compartiendo páginas
+        owned: Set[int] = set()
+        shared = self.ids is not None
+
+        while steps < max_steps:
+            if current_state == final_state:
+                self.halted = self.accepted = True
+                break
+
+            number, i = divmod(head_position, page_size)
+            page = pages.get(number)
+            symbol = page[i] if page is not None else 0
+            step = step_table.get((current_state, mem_cache, symbol), _UNRESOLVED)
+            if step is _UNRESOLVED:
+                step = resolve_step(current_state, mem_cache, symbol)
+            if step is None:
+                self.halted = self.no_transition = True
+                if ids is not None:
+                    ids.append(SparseDescription(
+                        state=f"{current_state} (SIN δ)",
+                        cells=tape.freeze(),
+                        symbols=symbols,
+                        head_absolute=head_position,
+                        mem_cache=mem_cache,
+                        step=steps + 1
+                    ))
+                break
+
+            current_state, mem_cache, code, delta, last_transition = step
+            steps += 1
+
+            # Escribir solo si cambia la celda; reservar/liberar páginas según haga falta
+            if code != symbol:
+                if page is None:
+                    page = tape.new_page(number)
+                    owned.add(number)
+                elif shared and number not in owned:
+                    page = pages[number] = page[:]
+                    owned.add(number)
+                page[i] = code
+                if not symbol:
+                    counts[number] += 1
+                elif not code:
+                    counts[number] -= 1
+                    if not counts[number]:
+                        del pages[number]
+                        del counts[number]
+                        owned.discard(number)
+
+            head_position += delta
+
+            if ids is not None:
+                ids.append(SparseDescription(
+                    state=current_state,
+                    cells=tape.freeze(),
+                    symbols=symbols,
+                    head_absolute=head_position,
+                    mem_cache=mem_cache,
+                    step=steps
+                ))
+                owned.clear()
+            if trace is not None:
+                trace.record(last_transition, tape, 0, head_position)
+
+            if current_state == final_state:
+                self.halted = self.accepted = True
+                break
+
+        self.head_position = head_position
+        self.state = current_state
+        self.mem_cache = mem_cache
+        self.steps = steps
+        self.last_transition = last_transition
+        return self.halted
+
+# ============================================================================
+# ENTRADAS GRANDES (ARCHIVOS Y BUFFERS MAPEADOS EN MEMORIA)
+# ============================================================================
+
+# Entrada de MachineRun: una cadena o un buffer de bytes (un símbolo por byte)
+InputData = Union[str, bytes, bytearray, memoryview, mmap.mmap]
+
+
+def invalid_symbols(alphabet: Iterable[str], s: str) -> Set[str]:
+    """Símbolos de `s` fuera de `alphabet`, borrando los válidos con str.translate."""
+    return set(s.translate(dict.fromkeys(ord(c) for c in alphabet
+                                         if isinstance(c, str) and len(c) == 1)))
+
+
+def _input_length(view: memoryview) -> int:
+    # Largo sin los saltos de línea finales (típicos al final de un archivo)
+    n = len(view)
+    while n and view[n - 1] in (10, 13):
+        n -= 1
+    return n
+
+
+def input_digest(data: Any) -> str:
+    """Huella SHA-256 de una entrada en buffer (la misma que calcula encode_input)."""
+    with memoryview(data) as base, base.cast('B') as view, view[:_input_length(view)] as part:
+        return hashlib.sha256(part).hexdigest()
+
+
+def encode_input(tm: TuringMachine, data: Any, chunk_size: int = 1 << 24) -> Tuple[array, str]:
+    """Buffer de entrada → cinta en códigos ([blanco] + entrada + [blanco]) y huella SHA-256.
+
+    Cada byte es un símbolo (latin-1) y los saltos de línea finales se
+    ignoran. El alfabeto se valida por bloques con bytes.translate y los
+    códigos se escriben directo en la cinta preasignada, sin crear un objeto
+    por símbolo.
+    """
+    codec = tm.codec
+    allowed = [c for c in tm.input_alphabet if isinstance(c, str) and len(c) == 1 and ord(c) < 256]
+    lut = np.zeros(256, dtype=np.uint16)
+    for c in allowed:
+        lut[ord(c)] = codec.code(c)
+    keep = bytes(ord(c) for c in allowed)
+    typecode = codec.typecode
+    table = lut.astype(np.uint8).tobytes() if typecode == 'B' else None
+    digest = hashlib.sha256()
+
+    with memoryview(data) as base, base.cast('B') as view:
+        n = _input_length(view)
+        tape = array(typecode, bytes((n + 2 if n else 1) * array(typecode).itemsize))
+        with memoryview(tape) as cells:
+            for k in range(0, n, chunk_size):
+                raw = bytes(view[k:min(k + chunk_size, n)])
+                bad = raw.translate(None, keep)
+                if bad:
+                    raise ValueError(f"La entrada contiene símbolos fuera de 'alphabet': "
+                                     f"{set(bad.decode('latin-1'))}")
+                digest.update(raw)
+                if table is not None:
+                    cells[1 + k:1 + k + len(raw)] = raw.translate(table)
+                else:
+                    cells[1 + k:1 + k + len(raw)] = lut[np.frombuffer(raw, dtype=np.uint8)]
+    return tape, digest.hexdigest()
+
+
+def simulate_input_file(tm: TuringMachine, path: str, max_steps: int = 10000,
+                        id_limit: Optional[int] = None, sparse: bool = False) -> MachineRun:
+    """Simula la MT sobre el contenido de un archivo, leído con mmap (un símbolo por byte).
+
+    Sin `id_limit` no se registran IDs; con él se registran solo las primeras
+    `id_limit` (cada una copia la cinta, así que conviene un límite pequeño).
+    """
+    record_ids = id_limit is not None
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                run = MachineRun(tm, data, record_ids=record_ids, sparse=sparse, id_limit=id_limit)
+        else:
+            run = MachineRun(tm, b"", record_ids=record_ids, sparse=sparse, id_limit=id_limit)
+    run.run_until(max_steps)
+    return run
+
+# ============================================================================
+# COMPILADOR DE MT A FUNCIÓN DE PYTHON
+# ============================================================================
+
+# Estado de salida de la función compilada
+_RUN_BUDGET = 0
+_RUN_ACCEPTED = 1
+_RUN_NO_DELTA = 2
+_RUN_STATIONARY_LOOP = 3
+# Estado de salida ≥ _RUN_BREAK: se cumplió el punto de parada (estado - _RUN_BREAK)
+_RUN_BREAK = 4
+
+
+@dataclass
+class CompiledMachine:
+    """Función de paso generada para una MT concreta (ver compile_machine).
+
+    `run(tape, head, offset, state, cache, steps, max_steps)` recibe la cinta en
+    códigos, el estado y la cache como índices en `states`/`cache_values`, y
+    devuelve (estado de salida, estado, cache, cabezal, offset, pasos, índice
+    de la última transición o -1).
+    """
+    fingerprint: str
+    states: List[str]
+    cache_values: List[Optional[str]]
+    source: str
+    run: Callable[..., Tuple[int, int, int, int, int, int, int]]
+
+
+# Caché de funciones compiladas por (huella de la MT, símbolos de la cinta, puntos de parada)
+_COMPILED_MACHINES: Dict[Tuple[str, Tuple[Optional[str], ...], Tuple['Breakpoint', ...]], CompiledMachine] = {}
+_COMPILED_LOCK = threading.Lock()
+
+
+def _machine_cache_values(tm: TuringMachine) -> List[Optional[str]]:
+    # Valores crudos que puede tomar la cache: el inicial (None) y los escritos por δ
+    return list(dict.fromkeys([None] + [t.output.mem_cache_value for t in tm.transitions]))
+
+
+def _stationary_chain(tm: TuringMachine,
+                      step: CodedStep) -> Tuple[List[CodedStep], Optional[int]]:
+    """Sigue la cadena de transiciones S (sin mover el cabezal) que empieza con `step`.
+
+    Devuelve los eslabones (el último es el primero que mueve el cabezal, llega
+    al estado final o precede a una configuración sin δ) y, si la cadena se
+    repite sin moverse, el índice donde empieza el ciclo.
+    """
+    links = [step]
+    seen: Dict[Tuple[str, Optional[str], int], int] = {}
+    while True:
+        target, cache_out, write, delta, _ = links[-1]
+        if delta or target == tm.final_state:
+            return links, None
+        key = (target, cache_out, write)
+        if key in seen:
+            return links, seen[key]
+        nxt = tm.resolve_coded_step(*key)
+        if nxt is None:
+            return links, None
+        seen[key] = len(links)
+        links.append(nxt)
+
+
+def find_stationary_loops(tm: TuringMachine) -> List[List[Tuple[str, Optional[str], Optional[str]]]]:
+    """Ciclos de transiciones S que nunca mueven el cabezal (bucles infinitos garantizados).
+
+    Cada ciclo se da como lista de configuraciones (estado, cache, símbolo bajo el cabezal).
+    """
+    loops: List[List[Tuple[str, Optional[str], Optional[str]]]] = []
+    found: Set[Tuple[str, Optional[str], int]] = set()
+    symbols = tm.codec.symbols
+    for t in tm.transitions:
+        if t.output.tape_displacement != Direction.STAY:
+            continue
+        if t not in tm.transition_map.values():
+            continue  # duplicada: nunca se elige
+        step = (t.output.final_state, t.output.mem_cache_value,
+                tm.codec.code(t.output.tape_output), 0, t)
+        links, loop_start = _stationary_chain(tm, step)
+        if loop_start is None:
+            continue
+        cycle = [(s[0], s[1], s[2]) for s in links[loop_start - 1:-1]]
+        if any(key in found for key in cycle):
+            continue
+        found.update(cycle)
+        loops.append([(s, c, symbols[code]) for s, c, code in cycle])
+    return loops
+
+
+def _generate_step_source(tm: TuringMachine, states: List[str],
+                          cache_values: List[Optional[str]],
+                          breakpoints: Sequence['Breakpoint'] = ()) -> str:
+    """Genera el código de la función de paso: un if por estado y por valor de cache,
+    y dentro pruebas de código de símbolo con la transición ya resuelta. Las
+    cadenas de movimientos S se fusionan en un solo paso (ver _stationary_chain).
+
+    Con `breakpoints`, tras cada transición se evalúan los puntos de parada
+    (las partes conocidas al compilar, como estado y cache, se resuelven ahí
+    mismo) y no se fusionan cadenas, para no saltar configuraciones.
+    """
+    state_index = {s: i for i, s in enumerate(states)}
+    cache_index = {c: i for i, c in enumerate(cache_values)}
+    transition_index = {id(t): i for i, t in enumerate(tm.transitions)}
+    n_codes = len(tm.codec.symbols)
+    final = state_index[tm.final_state]
+
+    out = [
+        "def run(tape, head, offset, state, cache, steps, max_steps):",
+        "    size = len(tape)",
+        "    t = -1",
+        f"    if steps < max_steps and state == {final}:",
+        f"        return {_RUN_ACCEPTED}, state, cache, head, offset, steps, t",
+        "    while steps < max_steps:",
+        "        c = tape[head]",
+    ]
+
+    def emit_link(pad: str, step: CodedStep, codes: List[int], count: int = 1) -> None:
+        target, cache_out, write, delta, tr = step
+        # Escritura omitida si la celda ya tiene ese símbolo
+        if codes != [write]:
+            out.append(f"{pad}tape[head] = {write}")
+        out.append(f"{pad}state = {state_index[target]}; cache = {cache_index[cache_out]}; "
+                   f"t = {transition_index[id(tr)]}; steps += {count}")
+        if delta > 0:
+            out.append(f"{pad}head += 1")
+            out.append(f"{pad}if head == size:")
+            out.append(f"{pad}    tape.append(0); size += 1")
+        elif delta < 0:
+            out.append(f"{pad}if head:")
+            out.append(f"{pad}    head -= 1")
+            out.append(f"{pad}else:")
+            out.append(f"{pad}    tape.insert(0, 0); size += 1; offset += 1")
+        if target == tm.final_state:
+            out.append(f"{pad}return {_RUN_ACCEPTED}, state, cache, head, offset, steps, t")
+        else:
+            emit_breakpoints(pad, target, cache_out, write, delta)
+
+    def emit_breakpoints(pad: str, target: str, cache_out: Optional[str], write: int, delta: int) -> None:
+        for bi, bp in enumerate(breakpoints):
+            if bp.state is not None and bp.state != target:
+                continue
+            if bp.cache is not None and _normalize_symbol(bp.cache) != _normalize_symbol(cache_out):
+                continue
+            conds = []
+            if bp.symbol is not None:
+                codes = tuple(c for c, sym in enumerate(tm.codec.symbols)
+                              if _normalize_symbol(sym) == _normalize_symbol(bp.symbol))
+                if not codes:
+                    continue
+                conds.append(f"tape[head] in {codes}")
+            if bp.head_range is not None:
+                conds.append(f"{bp.head_range[0]} <= head - offset <= {bp.head_range[1]}")
+            if bp.write_cell is not None:
+                # Posición absoluta antes de mover = después de mover - Δ
+                conds.append(f"c != {write} and head - offset == {bp.write_cell + delta}")
+            if bp.step is not None:
+                conds.append(f"steps == {bp.step}")
+            out.append(f"{pad}if {' and '.join(conds) or 'True'}:")
+            out.append(f"{pad}    return {_RUN_BREAK + bi}, state, cache, head, offset, steps, t")
+
+    def emit_step(pad: str, step: CodedStep, codes: List[int]) -> None:
+        if breakpoints:
+            emit_link(pad, step, codes)
+            return
+        links, loop_start = _stationary_chain(tm, step)
+        if loop_start is not None:
+            # Bucle sin movimiento: se salta al límite de pasos con la
+            # configuración exacta en la que terminaría la cadena
+            prefix, period = loop_start, len(links) - loop_start
+            table = tuple((state_index[s[0]], cache_index[s[1]], s[2], transition_index[id(s[4])])
+                          for s in links)
+            out.append(f"{pad}j = max_steps - steps - 1")
+            out.append(f"{pad}if j >= {len(links)}:")
+            out.append(f"{pad}    j = {prefix} + (j - {prefix}) % {period}")
+            out.append(f"{pad}state, cache, tape[head], t = {table}[j]")
+            out.append(f"{pad}steps = max_steps")
+            out.append(f"{pad}return {_RUN_STATIONARY_LOOP}, state, cache, head, offset, steps, t")
+        elif len(links) > 1:
+            # Superinstrucción: toda la cadena de movimientos S en un solo paso,
+            # si cabe en el presupuesto; si no, solo el primer eslabón
+            out.append(f"{pad}if steps + {len(links)} <= max_steps:")
+            emit_link(pad + "    ", links[-1], codes, len(links))
+            out.append(f"{pad}else:")
+            emit_link(pad + "    ", step, codes)
+        else:
+            emit_link(pad, step, codes)
+
+    no_delta = f"return {_RUN_NO_DELTA}, state, cache, head, offset, steps, t"
+    branch = "if"
+    for si, state in enumerate(states):
+        if state == tm.final_state:
+            continue
+        out.append(f"        {branch} state == {si}:")
+        branch = "elif"
+        for ci, cache in enumerate(cache_values):
+            out.append(f"            {'if' if ci == 0 else 'elif'} cache == {ci}:")
+            # Agrupar los códigos de símbolo por la transición que eligen
+            groups: Dict[int, Tuple[Optional[CodedStep], List[int]]] = {}
+            for code in range(n_codes):
+                step = tm.resolve_coded_step(state, cache, code)
+                key = id(step[4]) if step is not None else 0
+                groups.setdefault(key, (step, []))[1].append(code)
+            ordered = sorted(groups.values(), key=lambda g: len(g[1]))
+            default_step, default_codes = ordered.pop()
+            for gi, (step, codes) in enumerate(ordered):
+                test = f"c == {codes[0]}" if len(codes) == 1 else f"c in {tuple(codes)}"
+                out.append(f"                {'if' if gi == 0 else 'elif'} {test}:")
+                if step is None:
+                    out.append(f"                    {no_delta}")
+                else:
+                    emit_step("                    ", step, codes)
+            pad = "                    " if ordered else "                "
+            if ordered:
+                out.append("                else:")
+            if default_step is None:
+                out.append(f"{pad}{no_delta}")
+            else:
+                emit_step(pad, default_step, default_codes)
+        out.append("            else:")
+        out.append(f"                {no_delta}")
+    if branch == "if":
+        out.append(f"        {no_delta}")
+    else:
+        out.append("        else:")
+        out.append(f"            {no_delta}")
+    out.append(f"    return {_RUN_BUDGET}, state, cache, head, offset, steps, t")
+    return "\n".join(out) + "\n"
+
+
+def compile_machine(tm: TuringMachine, breakpoints: Sequence['Breakpoint'] = ()) -> CompiledMachine:
+    """Compila la δ de la MT a una función de Python especializada (con compile/exec).
+
+    La función se guarda por huella de la MT, por los símbolos conocidos del
+    codec (si una entrada agrega símbolos nuevos se genera otra versión) y por
+    los puntos de parada, que quedan compilados dentro del bucle.
+    """
+    breakpoints = tuple(breakpoints)
+    key = (tm.fingerprint(), tuple(tm.codec.symbols), breakpoints)
+    compiled = _COMPILED_MACHINES.get(key)
+    if compiled is not None:
+        return compiled
+    with _COMPILED_LOCK:
+        compiled = _COMPILED_MACHINES.get(key)
+        if compiled is None:
+            states = list(dict.fromkeys(
+                list(tm.states) + [tm.initial_state, tm.final_state] +
+                [s for t in tm.transitions for s in (t.params.initial_state, t.output.final_state)]
+            ))
+            cache_values = _machine_cache_values(tm)
+            source = _generate_step_source(tm, states, cache_values, breakpoints)
+            namespace: Dict[str, Any] = {}
+            exec(compile(source, f"<MT {key[0][:12]}>", "exec"), namespace)
+            compiled = CompiledMachine(fingerprint=key[0], states=states,
+                                       cache_values=cache_values, source=source,
+                                       run=namespace["run"])
+            _COMPILED_MACHINES[key] = compiled
+    return compiled
+
+
+def simulate_compiled(tm: TuringMachine, input_string: str,
+                      max_steps: int = 10000) -> Tuple[bool, int]:
+    """Veredicto y pasos (como len(ids) - 1 de simulate) con la función compilada."""
+    run = MachineRun(tm, input_string, record_ids=False)
+    run.run_until(max_steps)
+    return run.result()
+
+
+# ============================================================================
+# PUNTOS DE PARADA Y VIGILANCIA (COMPILADOS EN EL BUCLE)
+# ============================================================================
+
+@dataclass(frozen=True)
+class Breakpoint:
+    """Condición sobre la configuración alcanzada tras una transición.
+
+    Los campos dados deben cumplirse a la vez (None = cualquiera). Posiciones
+    absolutas: la celda 0 es el blanco a la izquierda de la entrada.
+    `write_cell` vigila la celda: se cumple cuando la transición cambia su símbolo.
+    Una transición que llega al estado final detiene la MT sin disparar puntos.
+    """
+    state: Optional[str] = None
+    symbol: Optional[str] = None                    # símbolo bajo el cabezal
+    cache: Optional[str] = None
+    head_range: Optional[Tuple[int, int]] = None    # [desde, hasta], inclusive
+    write_cell: Optional[int] = None
+    step: Optional[int] = None
+
+    def __post_init__(self):
+        if all(v is None for v in (self.state, self.symbol, self.cache, self.head_range,
+                                   self.write_cell, self.step)):
+            raise ValueError("El punto de parada necesita al menos una condición")
+
+    def __str__(self) -> str:
+        parts = []
+        if self.state is not None:
+            parts.append(f"estado = {self.state}")
+        if self.symbol is not None:
+            parts.append(f"símbolo = {_B(self.symbol)}")
+        if self.cache is not None:
+            parts.append(f"cache = {_B(self.cache)}")
+        if self.head_range is not None:
+            parts.append(f"cabezal ∈ [{self.head_range[0]}, {self.head_range[1]}]")
+        if self.write_cell is not None:
+            parts.append(f"escritura en celda {self.write_cell}")
+        if self.step is not None:
+            parts.append(f"paso = {self.step}")
+        return " y ".join(parts)
+
+
+@dataclass
+class BreakpointHit:
+    breakpoint: Optional[Breakpoint]    # None si la MT se detuvo o se agotaron los pasos
+    steps: int
+    halted: bool
+    accepted: bool
+    description: InstantaneousDescription
+    window: List[InstantaneousDescription]
+    run: MachineRun                     # para continuar hasta el siguiente punto
+
+
+# Pasos entre copias de la configuración mientras se busca un punto de parada
+_BREAKPOINT_SLICE = 1 << 16
+
+
+def _breakpoint_window(origin: MachineRun, step: int,
+                       window: int) -> List[InstantaneousDescription]:
+    # Se repite la ejecución sin IDs desde una copia anterior al punto (nunca
+    # desde la entrada) y solo se registran las IDs de la ventana alrededor
+    replay = origin.copy()
+    replay.run_until(max(0, step - window))
+    replay.ids = [replay.snapshot()]
+    replay.run_until(step + window)
+    return replay.ids
+
+
+def run_to_breakpoint(tm: TuringMachine, input_string: str, breakpoints: Sequence[Breakpoint],
+                      max_steps: int = 10000, window: int = 5,
+                      run: Optional[MachineRun] = None) -> BreakpointHit:
+    """Simula sin IDs hasta el primer punto de parada y devuelve la configuración
+    alcanzada con `window` pasos antes y después. Pasar `run` (de un resultado
+    anterior) continúa hasta el siguiente punto.
+
+    Se avanza por tramos guardando una copia al inicio de los dos últimos: la
+    ventana previa se reconstruye desde la más reciente que quede al menos
+    `window` pasos antes del punto, así que cada punto cuesta a lo sumo dos
+    tramos extra y no vuelve a simular desde el paso 0.
+    """
+    if run is None:
+        run = MachineRun(tm, input_string, record_ids=False)
+    slice_steps = max(_BREAKPOINT_SLICE, window)
+    origins = [] if run.breakpoint_origin is None else [run.breakpoint_origin]
+    while True:
+        origins = origins[-1:] + [run.copy()]
+        hit = run.run_to_breakpoint(breakpoints, min(max_steps, run.steps + slice_steps))
+        if hit is not None or run.halted or run.steps >= max_steps:
+            break
+    start = max(0, run.steps - window)
+    origin = next((o for o in reversed(origins) if o.steps <= start), origins[0])
+    run.breakpoint_origin = origin
+    ids = _breakpoint_window(origin, run.steps, window)
+    return BreakpointHit(
+        breakpoint=None if hit is None else breakpoints[hit],
+        steps=run.steps,
+        halted=run.halted,
+        accepted=run.accepted,
+        description=next(d for d in ids if d.step == run.steps),
+        window=ids,
+        run=run,
+    )
+
+
+# ============================================================================
+# MODO NO DETERMINISTA (BFS SOBRE CONFIGURACIONES)
+# ============================================================================
+
+@dataclass
+class NondeterministicResult:
+    accepted: bool
+    depth: int
+    frontier_sizes: List[int]
+    visited: int
+    truncated: bool
+    path: List[InstantaneousDescription]
+
+
+def _nd_successor(config: Tuple[Any, ...], t: Transition) -> Tuple[Any, ...]:
+    _, _, tape, head = config
+    cells = list(tape)
+    if head < 0:
+        cells[:0] = [None] * -head
+        head = 0
+    elif head >= len(cells):
+        cells.extend([None] * (head - len(cells) + 1))
+    cells[head] = t.output.tape_output
+    head += _MOVE_DELTA[t.output.tape_displacement]
+    return _config_key(t.output.final_state, t.output.mem_cache_value, cells, head)
+
+
+def _nd_description(config: Tuple[Any, ...], step: int) -> InstantaneousDescription:
+    state, mem_cache, tape, head = config
+    cells = list(tape) or [None]
+    if head < 0:
+        cells[:0] = [None] * -head
+        head = 0
+    elif head >= len(cells):
+        cells.extend([None] * (head - len(cells) + 1))
+    return InstantaneousDescription(state=state, tape=cells, head_position=head,
+                                    mem_cache=mem_cache, step=step)
+
+
+def simulate_nondeterministic(tm: TuringMachine, input_string: str, max_steps: int = 10000,
+                              max_frontier: int = 10000) -> NondeterministicResult:
+    """Explora todas las ramas de δ en anchura y acepta en cuanto una llega a final_state.
+
+    Las configuraciones visitadas se deduplican por hash (cinta recortada de
+    blancos). Si una frontera supera `max_frontier` se recorta y el resultado
+    queda marcado como `truncated`: un rechazo deja de ser concluyente.
+    """
+    tape = [None] + list(input_string) + [None] if input_string else [None]
+    start = _config_key(tm.initial_state, None, tape, 1 if input_string else 0)
+    parent: Dict[Tuple[Any, ...], Optional[Tuple[Any, ...]]] = {start: None}
+    frontier = [start]
+    frontier_sizes = [1]
+    truncated = False
+
+    def result(accepted: bool, depth: int, last: Optional[Tuple[Any, ...]]) -> NondeterministicResult:
+        chain = []
+        while last is not None:
+            chain.append(last)
+            last = parent[last]
+        chain.reverse()
+        return NondeterministicResult(
+            accepted=accepted, depth=depth, frontier_sizes=frontier_sizes,
+            visited=len(parent), truncated=truncated,
+            path=[_nd_description(c, i) for i, c in enumerate(chain)],
+        )
+
+    if max_steps > 0 and tm.initial_state == tm.final_state:
+        return result(True, 0, start)
+
+    depth = 0
+    while frontier and depth < max_steps:
+        depth += 1
+        next_frontier: List[Tuple[Any, ...]] = []
+        for config in frontier:
+            state, mem_cache, cells, head = config
+            symbol = cells[head] if 0 <= head < len(cells) else None
+            for t in tm.find_transitions(state, mem_cache, symbol):
+                child = _nd_successor(config, t)
+                if child in parent:
+                    continue
+                parent[child] = config
+                if child[0] == tm.final_state:
+                    frontier_sizes.append(len(next_frontier) + 1)
+                    return result(True, depth, child)
+                next_frontier.append(child)
+        if len(next_frontier) > max_frontier:
+            next_frontier = next_frontier[:max_frontier]
+            truncated = True
+        frontier = next_frontier
+        frontier_sizes.append(len(frontier))
+
+    return result(False, depth, None)
+
+
 # ============================================================================
 # CONSTRUCTOR DE MT DESDE YAML
 # ============================================================================
@@ -501,14 +1772,11 @@ def parse_direction(direction_str: str) -> Direction:
         return Direction.STAY
 
 
-def build_turing_machine_from_yaml(yaml_content: str, strict_mode: bool = False) -> Tuple[TuringMachine, List[str], List[str]]:
+def build_turing_machine_from_yaml(yaml_content: str, strict_mode: bool = False,
+                                   nondeterministic: bool = False) -> Tuple[TuringMachine, List[str], List[str]]:
     parser = YAMLParser()
     data = parser.parse(yaml_content)
     
-    # DEBUG: Mostrar datos parseados
-    st.sidebar.markdown("**DEBUG - Datos parseados:**")
-    st.sidebar.json(data, expanded=False)
-    
     # Extraer estados - MANEJO ROBUSTO
     q_states = data.get('q_states', {}) or {}
     
@@ -611,14 +1879,2244 @@ def build_turing_machine_from_yaml(yaml_content: str, strict_mode: bool = False)
         input_alphabet=input_alphabet,
         tape_alphabet=tape_alphabet,
         transitions=transitions,
-        strict_mode=strict_mode
+        strict_mode=strict_mode,
+        nondeterministic=nondeterministic
     )
 
     # En duro: si el motor encontró duplicadas, agrégalas a issues
-    # y evita simular.
-    dup_msgs = [f"Transición duplicada para {k}" for k in tm.duplicates]
+    # y evita simular. En modo no determinista son opciones válidas.
+    dup_msgs = [] if nondeterministic else [f"Transición duplicada para {k}" for k in tm.duplicates]
     return tm, simulation_strings, dup_msgs
 
+# ============================================================================
+# MINIMIZACIÓN: ESTADOS ALCANZABLES Y FUSIÓN DE EQUIVALENTES
+# ============================================================================
+
+def _machine_symbols(tm: TuringMachine) -> Tuple[List[Optional[str]], List[Optional[str]]]:
+    """Dominio de símbolos de cinta y de valores de cache (blanco incluido como None)."""
+    tape_syms: List[Optional[str]] = [None]
+    cache_vals: List[Optional[str]] = [None]
+    for sym in list(tm.tape_alphabet) + list(tm.input_alphabet) + \
+            [x for t in tm.transitions for x in (t.params.tape_input, t.output.tape_output)]:
+        if not _is_blank(sym) and str(sym) not in tape_syms:
+            tape_syms.append(str(sym))
+    for t in tm.transitions:
+        for c in (t.params.mem_cache_value, t.output.mem_cache_value):
+            if not _is_blank(c) and str(c) not in cache_vals:
+                cache_vals.append(str(c))
+    return tape_syms, cache_vals
+
+
+def minimize_machine(tm: TuringMachine) -> Tuple[TuringMachine, Dict[str, List[str]]]:
+    """Poda lo inalcanzable y fusiona estados equivalentes.
+
+    1. Alcanzabilidad sobre pares (estado, cache) desde (initial_state, B),
+       resolviendo δ con las mismas prioridades que la simulación: las
+       transiciones que nunca se eligen se descartan.
+    2. Refinamiento de particiones: dos estados quedan juntos si para todo
+       (cache, símbolo) producen (bloque destino, cache, escritura, movimiento)
+       iguales.
+
+    Devuelve la MT reducida y el mapeo estado nuevo → estados originales. Cada
+    bloque conserva el nombre de uno de sus estados originales, así que las
+    trazas siguen en términos del usuario.
+    """
+    if tm.nondeterministic:
+        raise ValueError("La minimización solo aplica a MT deterministas")
+
+    tape_syms, cache_vals = _machine_symbols(tm)
+
+    def norm(x: Optional[str]) -> Optional[str]:
+        return None if _is_blank(x) else str(x)
+
+    # 1) Pares (estado, cache) alcanzables y transiciones vivas
+    start = (tm.initial_state, None)
+    reachable = {start}
+    pending = [start]
+    while pending:
+        state, cache = pending.pop()
+        if state == tm.final_state:
+            continue
+        for sym in tape_syms:
+            tr = tm.find_transition(state, cache, sym)
+            if tr is None:
+                continue
+            nxt = (tr.output.final_state, norm(tr.output.mem_cache_value))
+            if nxt not in reachable:
+                reachable.add(nxt)
+                pending.append(nxt)
+
+    order = {s: i for i, s in enumerate(tm.states)}
+    live_states = sorted({s for s, _ in reachable}, key=lambda s: (order.get(s, len(order)), s))
+
+    # 2) Refinamiento: bloque inicial según sea o no el estado final
+    block = {s: (0 if s == tm.final_state else 1) for s in live_states}
+    while True:
+        signatures: Dict[str, Tuple[Any, ...]] = {}
+        for s in live_states:
+            if s == tm.final_state:
+                signatures[s] = (block[s], "final")
+                continue
+            row = []
+            for cache in cache_vals:
+                for sym in tape_syms:
+                    tr = tm.find_transition(s, cache, sym)
+                    row.append(None if tr is None else (
+                        block.get(tr.output.final_state, -1),
+                        norm(tr.output.mem_cache_value),
+                        norm(tr.output.tape_output),
+                        tr.output.tape_displacement,
+                    ))
+            signatures[s] = (block[s], tuple(row))
+        ids_of: Dict[Tuple[Any, ...], int] = {}
+        refined = {s: ids_of.setdefault(signatures[s], len(ids_of)) for s in live_states}
+        stable = len(ids_of) == len(set(block.values()))
+        block = refined
+        if stable:
+            break
+
+    # Representante: inicial y final conservan su nombre; si no, el primero en q_list
+    members: Dict[int, List[str]] = {}
+    for s in live_states:
+        members.setdefault(block[s], []).append(s)
+    rep: Dict[int, str] = {}
+    for b, group in members.items():
+        if tm.initial_state in group:
+            rep[b] = tm.initial_state
+        elif tm.final_state in group:
+            rep[b] = tm.final_state
+        else:
+            rep[b] = group[0]
+    rename = {s: rep[block[s]] for s in live_states}
+
+    # Transiciones del representante que ganan en algún par alcanzable del bloque
+    kept: Set[int] = set()
+    for state, cache in reachable:
+        r = rename[state]
+        if r == tm.final_state:
+            continue
+        for sym in tape_syms:
+            tr = tm.find_transition(r, cache, sym)
+            if tr is not None:
+                kept.add(id(tr))
+
+    transitions = [
+        Transition(
+            params=TransitionParams(t.params.initial_state, t.params.mem_cache_value, t.params.tape_input),
+            output=TransitionOutput(rename[t.output.final_state], t.output.mem_cache_value,
+                                    t.output.tape_output, t.output.tape_displacement),
+        )
+        for t in tm.transitions if id(t) in kept
+    ]
+    states = [s for s in live_states if rename[s] == s]
+    if tm.final_state not in states:
+        # El final es inalcanzable: se conserva para que la MT siga siendo válida
+        states.append(tm.final_state)
+
+    minimized = TuringMachine(
+        states=states,
+        initial_state=tm.initial_state,
+        final_state=tm.final_state,
+        input_alphabet=list(tm.input_alphabet),
+        tape_alphabet=list(tm.tape_alphabet),
+        transitions=transitions,
+        strict_mode=tm.strict_mode,
+    )
+    mapping = {r: [s for s in live_states if rename[s] == r] for r in states}
+    mapping.setdefault(tm.final_state, [tm.final_state])
+    return minimized, mapping
+
+
+# ============================================================================
+# δ COMPILADA Y MOTOR VECTORIZADO (NumPy)
+# ============================================================================
+
+@dataclass
+class DeltaTable:
+    """δ ya resuelta (con prioridades de comodín) sobre códigos enteros.
+
+    Los estados se codifican por índice y los símbolos con el blanco = 0.
+    Cada arreglo tiene forma [estado, cache, símbolo]; next_state = -1
+    significa que no hay transición aplicable.
+    """
+    states: List[str]
+    state_codes: Dict[str, int]
+    symbols: List[Optional[str]]
+    symbol_codes: Dict[str, int]
+    initial: int
+    final: int
+    next_state: np.ndarray
+    next_cache: np.ndarray
+    write: np.ndarray
+    move: np.ndarray
+    transition_index: np.ndarray
+
+    def code(self, symbol: Optional[str]) -> int:
+        if _is_blank(symbol):
+            return 0
+        return self.symbol_codes[str(symbol)]
+
+
+def compile_delta_table(tm: TuringMachine, extra_symbols: Iterable[str] = ()) -> DeltaTable:
+    # Símbolos: blanco primero, luego cinta, entrada, los usados en δ y los extra
+    symbols: List[Optional[str]] = [None]
+    symbol_codes: Dict[str, int] = {}
+
+    def add_symbol(sym: Optional[str]) -> None:
+        if _is_blank(sym) or str(sym) in symbol_codes:
+            return
+        symbol_codes[str(sym)] = len(symbols)
+        symbols.append(str(sym))
+
+    for sym in list(tm.tape_alphabet) + list(tm.input_alphabet):
+        add_symbol(sym)
+    for t in tm.transitions:
+        for sym in (t.params.mem_cache_value, t.params.tape_input,
+                    t.output.mem_cache_value, t.output.tape_output):
+            add_symbol(sym)
+    for sym in extra_symbols:
+        add_symbol(sym)
+
+    states: List[str] = list(dict.fromkeys(
+        list(tm.states) + [tm.initial_state, tm.final_state] +
+        [s for t in tm.transitions for s in (t.params.initial_state, t.output.final_state)]
+    ))
+    state_codes = {s: i for i, s in enumerate(states)}
+
+    n_states, n_syms = len(states), len(symbols)
+    shape = (n_states, n_syms, n_syms)
+    next_state = np.full(shape, -1, dtype=np.int32)
+    next_cache = np.zeros(shape, dtype=np.int32)
+    write = np.zeros(shape, dtype=np.int32)
+    move = np.zeros(shape, dtype=np.int8)
+    transition_index = np.full(shape, -1, dtype=np.int32)
+
+    index_of = {id(t): i for i, t in enumerate(tm.transitions)}
+    for q, state in enumerate(states):
+        for c, cache in enumerate(symbols):
+            for x, sym in enumerate(symbols):
+                tr = tm.find_transition(state, cache, sym)
+                if tr is None:
+                    continue
+                next_state[q, c, x] = state_codes[tr.output.final_state]
+                next_cache[q, c, x] = 0 if _is_blank(tr.output.mem_cache_value) \
+                    else symbol_codes[str(tr.output.mem_cache_value)]
+                write[q, c, x] = 0 if _is_blank(tr.output.tape_output) \
+                    else symbol_codes[str(tr.output.tape_output)]
+                move[q, c, x] = _MOVE_DELTA[tr.output.tape_displacement]
+                transition_index[q, c, x] = index_of[id(tr)]
+
+    return DeltaTable(
+        states=states, state_codes=state_codes,
+        symbols=symbols, symbol_codes=symbol_codes,
+        initial=state_codes[tm.initial_state], final=state_codes[tm.final_state],
+        next_state=next_state, next_cache=next_cache, write=write, move=move,
+        transition_index=transition_index,
+    )
+
+
+def _encode_strings(table: DeltaTable, strings: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Convierte todas las cadenas de una vez a códigos (vía puntos de código UTF-32)."""
+    lengths = np.fromiter((len(s) for s in strings), dtype=np.int64, count=len(strings))
+    joined = "".join(strings)
+    if not joined:
+        return np.zeros(0, dtype=np.int32), lengths
+    chars = sorted(set(joined))
+    keys = np.array([ord(ch) for ch in chars], dtype=np.uint32)
+    vals = np.array([table.code(ch) for ch in chars], dtype=np.int32)
+    points = np.frombuffer(joined.encode("utf-32-le"), dtype=np.uint32)
+    return vals[np.searchsorted(keys, points)], lengths
+
+
+def _simulate_lockstep(table: DeltaTable, codes: np.ndarray, lengths: np.ndarray,
+                       max_steps: int) -> Tuple[np.ndarray, np.ndarray]:
+    n = len(lengths)
+    accepted = np.zeros(n, dtype=bool)
+    steps = np.full(n, max_steps, dtype=np.int64)
+    if n == 0 or max_steps <= 0:
+        steps[:] = 0
+        return accepted, steps
+    if table.initial == table.final:
+        accepted[:] = True
+        steps[:] = 0
+        return accepted, steps
+
+    n_states, n_syms = table.next_state.shape[0], table.next_state.shape[1]
+
+    # Estado sumidero extra para carriles retirados: no mueve, no escribe nada nuevo
+    sink = n_states
+    shape = (n_states + 1, n_syms, n_syms)
+    next_state = np.empty(shape, dtype=np.int32)
+    next_state[:n_states] = table.next_state
+    next_state[sink] = sink
+    next_cache = np.empty(shape, dtype=np.int32)
+    next_cache[:n_states] = table.next_cache
+    next_cache[sink] = np.arange(n_syms, dtype=np.int32)[:, None]
+    write = np.empty(shape, dtype=np.int32)
+    write[:n_states] = table.write
+    write[sink] = np.arange(n_syms, dtype=np.int32)[None, :]
+    move = np.zeros(shape, dtype=np.int64)
+    move[:n_states] = table.move
+    next_state, next_cache, write, move = (a.ravel() for a in (next_state, next_cache, write, move))
+
+    # Cinta: [B] + entrada + [B] para todos los carriles, alineada en la columna `origin`
+    cell_dtype = np.uint8 if n_syms <= 256 else np.uint16
+    origin = 1
+    width = int(lengths.max()) + 2 + origin
+    tape = np.zeros((n, width), dtype=cell_dtype)
+    if codes.size:
+        rows = np.repeat(np.arange(n), lengths)
+        starts = np.cumsum(lengths) - lengths
+        cols = origin + 1 + np.arange(codes.size) - np.repeat(starts, lengths)
+        tape[rows, cols] = codes
+
+    lane = np.arange(n)
+    state = np.full(n, table.initial, dtype=np.int64)
+    cache = np.zeros(n, dtype=np.int64)
+    head = np.full(n, origin + 1, dtype=np.int64)
+    retired = 0
+
+    step = 0
+    while lane.size and step < max_steps:
+        rows = np.arange(lane.size)
+        key = (state * n_syms + cache) * n_syms + tape[rows, head]
+        nxt = next_state[key]
+
+        # Sin δ: se registra el paso extra "(SIN δ)" igual que simulate
+        halted = nxt < 0
+        if halted.any():
+            steps[lane[halted]] = step + 1
+            nxt[halted] = sink
+            key[halted] = (sink * n_syms + cache[halted]) * n_syms + tape[rows[halted], head[halted]]
+            retired += int(halted.sum())
+
+        step += 1
+        tape[rows, head] = write[key]
+        cache = next_cache[key]
+        head = head + move[key]
+        state = nxt.astype(np.int64)
+
+        # Extensión inmediata de la cinta por ambos lados
+        if head.min() < 0:
+            pad = tape.shape[1]
+            tape = np.concatenate([np.zeros((lane.size, pad), dtype=cell_dtype), tape], axis=1)
+            head += pad
+        if head.max() >= tape.shape[1]:
+            tape = np.concatenate([tape, np.zeros_like(tape)], axis=1)
+
+        done = state == table.final
+        if done.any():
+            accepted[lane[done]] = True
+            steps[lane[done]] = step
+            state[done] = sink
+            retired += int(done.sum())
+
+        # Compactar cuando la mitad de los carriles ya terminó
+        if retired and retired * 2 >= lane.size:
+            keep = state != sink
+            lane, state, cache, head, tape = lane[keep], state[keep], cache[keep], head[keep], tape[keep]
+            retired = 0
+
+    return accepted, steps
+
+
+def simulate_batch_numpy(tm: TuringMachine, strings: Sequence[str], max_steps: int = 10000,
+                         chunk_size: int = 65536) -> List[Tuple[bool, int]]:
+    """Simula muchas cadenas en paralelo; devuelve (aceptada, pasos) como simulate.
+
+    `pasos` es len(ids) - 1, la misma cifra que muestran las pestañas
+    Simulación y Estadísticas.
+    """
+    strings = list(strings)
+    table = compile_delta_table(tm, extra_symbols=set("".join(strings)))
+    results: List[Tuple[bool, int]] = [(False, 0)] * len(strings)
+
+    # Agrupar por longitud reduce el relleno de la matriz de cinta
+    order = sorted(range(len(strings)), key=lambda i: len(strings[i]))
+    for start in range(0, len(order), chunk_size):
+        idx = order[start:start + chunk_size]
+        codes, lengths = _encode_strings(table, [strings[i] for i in idx])
+        accepted, steps = _simulate_lockstep(table, codes, lengths, max_steps)
+        for i, acc, n in zip(idx, accepted.tolist(), steps.tolist()):
+            results[i] = (acc, n)
+    return results
+
+# ============================================================================
+# ENUMERACIÓN DEL LENGUAJE (Σ^≤n) CON MEMOIZACIÓN DE CONFIGURACIONES
+# ============================================================================
+
+# Cota "infinita" para configuraciones que entran en un ciclo
+_NEVER_HALTS = 1 << 62
+# Celdas de cinta a partir de las cuales simulate_memoized deja de memoizar
+_MEMO_MAX_TAPE = 4096
+
+
+def _config_key(state: str, mem_cache: Optional[str], tape: List[Optional[str]],
+                head_position: int) -> Tuple[Any, ...]:
+    # La cinta se recorta de blancos: la misma configuración se reconoce
+    # aunque cada corrida haya extendido la cinta de forma distinta.
+    lo, hi = 0, len(tape)
+    while lo < hi and tape[lo] is None:
+        lo += 1
+    while hi > lo and tape[hi - 1] is None:
+        hi -= 1
+    if lo == hi:
+        return (state, mem_cache, (), 0)
+    return (state, mem_cache, tuple(tape[lo:hi]), head_position - lo)
+
+
+def _packed_config_key(run: MachineRun) -> Tuple[Any, ...]:
+    # Como _config_key, pero sobre la cinta en códigos y con la cinta recortada
+    # resumida en un digest de 16 bytes (la clave no crece con la cinta)
+    # Se recorta por bytes en C; un código no blanco tiene algún byte distinto de 0,
+    # así que los bytes nulos de los bordes / itemsize son celdas blancas enteras
+    raw = run.tape.tobytes()
+    size = run.tape.itemsize
+    lo = (len(raw) - len(raw.lstrip(b"\0"))) // size * size
+    if lo == len(raw):
+        return (run.state, run.mem_cache, b"", 0)
+    hi = len(raw) - (len(raw) - len(raw.rstrip(b"\0"))) // size * size
+    return (run.state, run.mem_cache, hashlib.blake2b(raw[lo:hi], digest_size=16).digest(),
+            run.head_position - lo // size)
+
+
+class ConfigurationMemo:
+    """Configuración → veredicto compartido entre entradas de una misma MT.
+
+    Cada entrada guarda (aceptada, pasos_restantes) si la configuración
+    detiene la máquina, o (None, cota) si se sabe que tarda al menos `cota`
+    pasos más en detenerse.
+    """
+
+    def __init__(self, max_entries: int = 2_000_000):
+        self.max_entries = max_entries
+        self.table: Dict[Tuple[Any, ...], Tuple[Optional[bool], int]] = {}
+        self.hits = 0
+
+    def store(self, key: Tuple[Any, ...], value: Tuple[Optional[bool], int]) -> None:
+        old = self.table.get(key)
+        if old is None:
+            if len(self.table) < self.max_entries:
+                self.table[key] = value
+        elif old[0] is None:
+            # Un veredicto exacto reemplaza a la cota; dos cotas se quedan con la mayor
+            self.table[key] = value if value[0] is not None else (None, max(old[1], value[1]))
+
+
+def simulate_memoized(tm: TuringMachine, input_string: str, max_steps: int,
+                      memo: ConfigurationMemo) -> Tuple[bool, int]:
+    """Igual que simulate (aceptada, len(ids) - 1), pero reutilizando `memo`.
+
+    Si la cinta pasa de _MEMO_MAX_TAPE celdas se deja de memoizar y la
+    ejecución termina de corrido (así el costo por paso no crece con la cinta).
+    """
+    if max_steps <= 0:
+        return False, 0
+    run = MachineRun(tm, input_string, record_ids=False)
+
+    path: List[Tuple[Any, ...]] = []
+    on_path: Set[Tuple[Any, ...]] = set()
+
+    def finish_halting(accepted: bool, total: int) -> Tuple[bool, int]:
+        for i, key in enumerate(path):
+            memo.store(key, (accepted, total - i))
+        if total <= max_steps:
+            return accepted, total
+        return False, max_steps
+
+    def finish_lower_bound(bound_at: int, bound: int) -> Tuple[bool, int]:
+        for i, key in enumerate(path):
+            memo.store(key, (None, min(bound + bound_at - i, _NEVER_HALTS)))
+        return False, max_steps
+
+    while run.steps < max_steps:
+        if len(run.tape) > _MEMO_MAX_TAPE:
+            break
+        steps = run.steps
+        key = _packed_config_key(run)
+        hit = memo.table.get(key)
+        if hit is not None:
+            verdict, remaining = hit
+            if verdict is not None:
+                memo.hits += 1
+                return finish_halting(verdict, steps + remaining)
+            if steps + remaining > max_steps:
+                memo.hits += 1
+                return finish_lower_bound(steps, remaining)
+        if key in on_path:
+            # Misma configuración dos veces en una corrida determinista: ciclo
+            return finish_lower_bound(steps, _NEVER_HALTS)
+        path.append(key)
+        on_path.add(key)
+
+        if run.advance(1):
+            return finish_halting(*run.result())
+
+    # Cinta demasiado grande: el resto sin memoizar (path sigue siendo válido)
+    if run.run_until(max_steps):
+        return finish_halting(*run.result())
+    # Límite de pasos: desde path[i] la máquina no se detiene en menos de
+    # max_steps - i + 1 pasos.
+    return finish_lower_bound(max_steps, 1)
+
+
+def enumerate_language(tm: TuringMachine, max_length: int, max_steps: int = 10000,
+                       lengths: Optional[Iterable[int]] = None, prefix: str = "",
+                       memo: Optional[ConfigurationMemo] = None) -> Iterator[Tuple[str, bool, int]]:
+    """Recorre Σ^≤n (orden por longitud y lexicográfico) y emite (cadena, aceptada, pasos)."""
+    memo = memo if memo is not None else ConfigurationMemo()
+    alphabet = list(tm.input_alphabet)
+    wanted = sorted(set(lengths)) if lengths is not None else range(max_length + 1)
+    for length in wanted:
+        if length < len(prefix) or length > max_length:
+            continue
+        for tail in itertools.product(alphabet, repeat=length - len(prefix)):
+            s = prefix + "".join(tail)
+            accepted, steps = simulate_memoized(tm, s, max_steps, memo)
+            yield s, accepted, steps
+
+
+def _enumerate_task(args: Tuple[TuringMachine, int, int, Optional[List[int]], str]) -> List[Tuple[str, bool, int]]:
+    tm, max_length, max_steps, lengths, prefix = args
+    return list(enumerate_language(tm, max_length, max_steps, lengths=lengths, prefix=prefix))
+
+
+def enumerate_language_parallel(tm: TuringMachine, max_length: int, max_steps: int = 10000,
+                                split: str = "length",
+                                workers: Optional[int] = None) -> Iterator[Tuple[str, bool, int]]:
+    """Reparte Σ^≤n entre procesos por longitud o por primer símbolo.
+
+    Cada proceso tiene su propia memo; los resultados se emiten por tarea
+    a medida que terminan (sin orden garantizado entre tareas).
+    """
+    if split == "length":
+        tasks = [(tm, max_length, max_steps, [n], "") for n in range(max_length + 1)]
+    elif split == "prefix":
+        tasks = [(tm, max_length, max_steps, [0], "")]
+        tasks += [(tm, max_length, max_steps, None, sym) for sym in tm.input_alphabet]
+    else:
+        raise ValueError(f"Modo de reparto desconocido: '{split}' (usa 'length' o 'prefix')")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for future in as_completed([pool.submit(_enumerate_task, t) for t in tasks]):
+            yield from future.result()
+
+
+@dataclass
+class LanguageSummary:
+    accepted: List[str]
+    rejected: List[str]
+    steps: Dict[str, int]
+
+    @property
+    def accepted_count(self) -> int:
+        return len(self.accepted)
+
+    @property
+    def rejected_count(self) -> int:
+        return len(self.rejected)
+
+
+def summarize_language(results: Iterable[Tuple[str, bool, int]]) -> LanguageSummary:
+    summary = LanguageSummary(accepted=[], rejected=[], steps={})
+    for s, accepted, steps in results:
+        (summary.accepted if accepted else summary.rejected).append(s)
+        summary.steps[s] = steps
+    return summary
+
+# ============================================================================
+# EQUIVALENCIA ACOTADA ENTRE DOS MT
+# ============================================================================
+
+@dataclass
+class Counterexample:
+    input_string: str
+    reason: str                     # "veredicto" o "cinta"
+    accepted: Tuple[bool, bool]
+    steps: Tuple[int, int]
+    tapes: Tuple[Tuple[int, Tuple[Optional[str], ...]], Tuple[int, Tuple[Optional[str], ...]]]
+    ids: Tuple[List[InstantaneousDescription], List[InstantaneousDescription]]
+
+
+@dataclass
+class EquivalenceResult:
+    equivalent: bool
+    checked: int
+    counterexample: Optional[Counterexample]
+
+
+def _final_tape(run: MachineRun) -> Tuple[int, Tuple[Optional[str], ...]]:
+    # (posición absoluta del primer símbolo, símbolos) sin blancos en los extremos
+    cells = [None if _is_blank(x) else str(x) for x in run.cells()]
+    lo, hi = 0, len(cells)
+    while lo < hi and cells[lo] is None:
+        lo += 1
+    while hi > lo and cells[hi - 1] is None:
+        hi -= 1
+    return (lo - run.offset if lo < hi else 0), tuple(cells[lo:hi])
+
+
+def _equivalence_task(args: Tuple[TuringMachine, TuringMachine, List[str], int, bool]) -> Optional[int]:
+    """Índice de la primera cadena del bloque en la que las MT difieren (o None)."""
+    tm_a, tm_b, strings, max_steps, compare_tapes = args
+    if not compare_tapes:
+        verdicts_a = simulate_batch_numpy(tm_a, strings, max_steps)
+        verdicts_b = simulate_batch_numpy(tm_b, strings, max_steps)
+        for i, ((acc_a, _), (acc_b, _)) in enumerate(zip(verdicts_a, verdicts_b)):
+            if acc_a != acc_b:
+                return i
+        return None
+    for i, s in enumerate(strings):
+        run_a = MachineRun(tm_a, s, record_ids=False)
+        run_b = MachineRun(tm_b, s, record_ids=False)
+        run_a.run_until(max_steps)
+        run_b.run_until(max_steps)
+        if run_a.accepted != run_b.accepted or _final_tape(run_a) != _final_tape(run_b):
+            return i
+    return None
+
+
+def _counterexample(tm_a: TuringMachine, tm_b: TuringMachine, input_string: str,
+                    max_steps: int) -> Counterexample:
+    runs = (MachineRun(tm_a, input_string), MachineRun(tm_b, input_string))
+    for run in runs:
+        run.run_until(max_steps)
+    accepted = (runs[0].accepted, runs[1].accepted)
+    return Counterexample(
+        input_string=input_string,
+        reason="veredicto" if accepted[0] != accepted[1] else "cinta",
+        accepted=accepted,
+        steps=(len(runs[0].ids) - 1, len(runs[1].ids) - 1),
+        tapes=(_final_tape(runs[0]), _final_tape(runs[1])),
+        ids=(runs[0].ids, runs[1].ids),
+    )
+
+
+def check_equivalence(tm_a: TuringMachine, tm_b: TuringMachine, max_length: int,
+                      max_steps: int = 10000, sample: Optional[int] = None,
+                      seed: Optional[int] = None, compare_tapes: bool = False,
+                      workers: Optional[int] = None, chunk_size: int = 2048) -> EquivalenceResult:
+    """Compara dos MT en todas las cadenas de longitud ≤ n (o en `sample` cadenas al azar).
+
+    Compara veredictos con el motor por lotes y, con `compare_tapes`, también la
+    cinta final (sin blancos en los extremos). Los bloques se reparten entre
+    procesos y se revisan en orden, así que el contraejemplo reportado es el
+    primero encontrado en orden de longitud; al hallarlo se cancela el resto.
+    Las cadenas cortadas por `max_steps` cuentan como rechazadas, igual que en
+    la pestaña de simulación.
+    """
+    if tm_a.nondeterministic or tm_b.nondeterministic:
+        raise ValueError("La comparación de equivalencia requiere MT deterministas")
+    alphabet = list(dict.fromkeys(tm_a.input_alphabet + tm_b.input_alphabet))
+
+    if sample is not None:
+        rng = random.Random(seed)
+        strings: Iterable[str] = (
+            "".join(rng.choice(alphabet) for _ in range(rng.randint(0, max_length)))
+            if alphabet else "" for _ in range(sample)
+        )
+    else:
+        strings = ("".join(t) for n in range(max_length + 1)
+                   for t in itertools.product(alphabet, repeat=n))
+
+    def chunks() -> Iterator[List[str]]:
+        it = iter(strings)
+        while True:
+            chunk = list(itertools.islice(it, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    checked = 0
+    found: Optional[str] = None
+    if workers == 1:
+        for chunk in chunks():
+            hit = _equivalence_task((tm_a, tm_b, chunk, max_steps, compare_tapes))
+            if hit is not None:
+                checked += hit + 1
+                found = chunk[hit]
+                break
+            checked += len(chunk)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Pocos bloques en vuelo a la vez: Σ^≤n puede ser enorme
+            in_flight = 2 * (workers or os.cpu_count() or 1)
+            pending: deque = deque()
+            source = chunks()
+            while True:
+                while len(pending) < in_flight:
+                    chunk = next(source, None)
+                    if chunk is None:
+                        break
+                    pending.append((chunk, pool.submit(
+                        _equivalence_task, (tm_a, tm_b, chunk, max_steps, compare_tapes))))
+                if not pending:
+                    break
+                chunk, future = pending.popleft()
+                hit = future.result()
+                if hit is not None:
+                    checked += hit + 1
+                    found = chunk[hit]
+                    for _, f in pending:
+                        f.cancel()
+                    break
+                checked += len(chunk)
+
+    if found is None:
+        return EquivalenceResult(equivalent=True, checked=checked, counterexample=None)
+    return EquivalenceResult(equivalent=False, checked=checked,
+                             counterexample=_counterexample(tm_a, tm_b, found, max_steps))
+
+
+def check_equivalence_yaml(yaml_a: str, yaml_b: str, max_length: int,
+                           strict_mode: bool = False, **kwargs: Any) -> EquivalenceResult:
+    """check_equivalence a partir de dos definiciones YAML."""
+    tm_a, _, _ = build_turing_machine_from_yaml(yaml_a, strict_mode=strict_mode)
+    tm_b, _, _ = build_turing_machine_from_yaml(yaml_b, strict_mode=strict_mode)
+    return check_equivalence(tm_a, tm_b, max_length, **kwargs)
+
+# ============================================================================
+# COMPOSICIÓN SECUENCIAL DE MT (PIPELINE CON LA MISMA CINTA)
+# ============================================================================
+
+@dataclass
+class StageResult:
+    stage: int                  # índice de la MT en el pipeline
+    accepted: bool
+    steps: int                  # igual que len(ids) - 1 de simulate
+    state: str                  # estado en el que terminó la etapa
+
+
+@dataclass
+class PipelineResult:
+    input_string: str
+    accepted: bool              # todas las etapas aceptaron
+    stages: List[StageResult]   # hasta la primera etapa que no acepta
+    run: Optional[MachineRun] = None    # ejecución de la última etapa (solo en run)
+
+    @property
+    def steps(self) -> int:
+        return sum(s.steps for s in self.stages)
+
+
+def hand_off(run: MachineRun, tm: TuringMachine) -> MachineRun:
+    """Ejecución de `tm` que arranca sobre la cinta final de `run`: mismo buffer y mismo cabezal.
+
+    Si los códigos de símbolo de ambas MT coinciden la cinta pasa tal cual; si
+    no, se traduce en su lugar con NumPy (solo se copia si `tm` necesita
+    celdas más anchas). La cinta deja de pertenecer a `run`.
+    """
+    nxt = MachineRun(tm, "", record_ids=False, sparse=run.sparse)
+    nxt.input_string, nxt.input_digest = run.input_string, run.input_digest
+    mapping = [tm.codec.code(sym) for sym in run.symbols]
+    tape = run.tape
+    typecode = tm.codec.typecode
+    same_codes = mapping == list(range(len(mapping)))
+    lut = np.asarray(mapping, dtype=typecode)
+    if run.sparse:
+        if not same_codes or tape.typecode != typecode:
+            # Las páginas pueden estar compartidas con IDs: se reemplazan, no se pisan
+            for number, page in tape.pages.items():
+                tape.pages[number] = array(typecode, lut[np.frombuffer(page, dtype=page.typecode)].tobytes())
+            tape.typecode = typecode
+    elif tape.typecode != typecode:
+        tape = array(typecode, lut[np.frombuffer(tape, dtype=tape.typecode)].tobytes())
+    elif not same_codes:
+        cells = np.frombuffer(tape, dtype=typecode)
+        cells[:] = lut[cells]
+        del cells
+    nxt.tape = tape
+    nxt.head_position = run.head_position
+    nxt.offset = run.offset
+    return nxt
+
+
+class MachinePipeline:
+    """Composición secuencial: cada MT arranca sobre la cinta y el cabezal finales de la anterior.
+
+    La siguiente etapa solo corre si la anterior aceptó; el pipeline acepta
+    si aceptan todas. `max_steps` es por etapa.
+    """
+
+    def __init__(self, machines: Sequence[TuringMachine]):
+        if not machines:
+            raise ValueError("El pipeline necesita al menos una MT")
+        self.machines = list(machines)
+
+    def run(self, input_string: InputData, max_steps: int = 10000,
+            sparse: bool = False) -> PipelineResult:
+        run = MachineRun(self.machines[0], input_string, record_ids=False, sparse=sparse)
+        stages = []
+        for i, tm in enumerate(self.machines):
+            if i:
+                run = hand_off(run, tm)
+            run.run_until(max_steps)
+            stages.append(StageResult(stage=i, accepted=run.accepted,
+                                      steps=run.reported_steps, state=run.state))
+            if not run.accepted:
+                break
+        return PipelineResult(input_string=run.input_string, accepted=stages[-1].accepted and
+                              len(stages) == len(self.machines), stages=stages, run=run)
+
+    def run_batch(self, strings: Sequence[str], max_steps: int = 10000,
+                  workers: Optional[int] = None, chunk_size: int = 256) -> List[PipelineResult]:
+        """Corre el pipeline sobre cada cadena, por tramos en procesos aparte (en el orden de entrada).
+
+        Con `workers=1` corre en este proceso. Los resultados no traen `run`.
+        """
+        chunks = [(self, list(strings[i:i + chunk_size]), max_steps)
+                  for i in range(0, len(strings), chunk_size)]
+        if workers == 1:
+            return [r for c in chunks for r in _pipeline_task(c)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return [r for part in pool.map(_pipeline_task, chunks) for r in part]
+
+
+def _pipeline_task(args: Tuple[MachinePipeline, List[str], int]) -> List[PipelineResult]:
+    pipeline, strings, max_steps = args
+    results = []
+    for s in strings:
+        result = pipeline.run(s, max_steps)
+        result.run = None
+        results.append(result)
+    return results
+
+
+# ============================================================================
+# PERFIL EMPÍRICO DE COMPLEJIDAD (TIEMPO / ESPACIO POR LONGITUD)
+# ============================================================================
+
+@dataclass
+class LengthProfile:
+    length: int
+    count: int
+    max_steps: int
+    mean_steps: float
+    max_cells: int
+    mean_cells: float
+    cutoffs: int                    # cadenas cortadas por max_steps
+
+
+@dataclass
+class ComplexityFit:
+    """Ajuste valor ≈ constant + coefficient · n^exponent por mínimos cuadrados."""
+    exponent: int
+    coefficient: float
+    constant: float
+
+    @property
+    def label(self) -> str:
+        k = self.exponent
+        return "O(1)" if k == 0 else "O(n)" if k == 1 else f"O(n^{k})"
+
+    def __call__(self, n: float) -> float:
+        return self.constant + self.coefficient * n ** self.exponent
+
+
+@dataclass
+class ComplexityProfile:
+    lengths: List[LengthProfile]
+    time: Optional[ComplexityFit]
+    space: Optional[ComplexityFit]
+
+
+def _fit_power(points: Sequence[Tuple[int, float]], max_exponent: int = 4) -> Optional[ComplexityFit]:
+    # Se prueba cada k entero y se queda el de menor error (a igual error, el menor k)
+    if len(points) < 3:
+        return None
+    n = np.array([p[0] for p in points], dtype=float)
+    y = np.array([p[1] for p in points], dtype=float)
+    best: Optional[Tuple[float, ComplexityFit]] = None
+    for k in range(max_exponent + 1):
+        basis = np.column_stack([np.ones_like(n), n ** k]) if k else np.ones((len(n), 1))
+        coef, *_ = np.linalg.lstsq(basis, y, rcond=None)
+        error = float(np.sum((basis @ coef - y) ** 2))
+        fit = ComplexityFit(exponent=k, coefficient=float(coef[1]) if k else 0.0,
+                            constant=float(coef[0]))
+        if best is None or error < best[0] * (1 - 1e-6) - 1e-9:
+            best = (error, fit)
+    return best[1]
+
+
+def _profile_task(args: Tuple[TuringMachine, int, List[str], Optional[int], Optional[str], int]) -> LengthProfile:
+    # Las cadenas se generan aquí, una a la vez: el proceso padre solo manda el alfabeto
+    tm, length, alphabet, sample, seed, max_steps = args
+    if sample is None:
+        strings: Iterable[str] = ("".join(t) for t in itertools.product(alphabet, repeat=length))
+    else:
+        rng = random.Random(seed)
+        strings = ("".join(rng.choice(alphabet) for _ in range(length)) for _ in range(sample))
+    steps: List[int] = []
+    cells: List[int] = []
+    cutoffs = 0
+    for s in strings:
+        run = MachineRun(tm, s, record_ids=False)
+        run.run_until(max_steps)
+        steps.append(run.reported_steps)
+        cells.append(len(run.tape))
+        cutoffs += not run.halted
+    return LengthProfile(length=length, count=len(steps),
+                         max_steps=max(steps), mean_steps=sum(steps) / len(steps),
+                         max_cells=max(cells), mean_cells=sum(cells) / len(cells),
+                         cutoffs=cutoffs)
+
+
+def profile_complexity(tm: TuringMachine, max_length: int, max_steps: int = 10000,
+                       sample: Optional[int] = None, seed: Optional[int] = None,
+                       workers: Optional[int] = None,
+                       exhaustive_limit: int = 4096) -> ComplexityProfile:
+    """Pasos y celdas por longitud de entrada (0..n) y ajuste a O(n^k).
+
+    Por cada longitud usa todas las cadenas de Σ^n, o `sample` cadenas al azar
+    si hay más que eso. Sin `sample`, una longitud con más de
+    `exhaustive_limit` cadenas se muestrea con esa cantidad (Σ^n crece
+    exponencialmente). Cada longitud es una tarea en un proceso aparte, que
+    genera sus propias cadenas. Las celdas son las de la cinta alcanzada
+    (entrada incluida): len(cinta) al terminar. El ajuste usa el peor caso
+    (máximo) de cada longitud; si hay cadenas cortadas por max_steps el ajuste
+    subestima el crecimiento.
+    """
+    alphabet = list(tm.input_alphabet)
+    limit = exhaustive_limit if sample is None else sample
+    tasks = []
+    for n in range(max_length + 1):
+        # Semilla por longitud: el resultado no depende del orden de las tareas
+        length_seed = None if seed is None else f"{seed}:{n}"
+        tasks.append((tm, n, alphabet, limit if len(alphabet) ** n > limit else None,
+                      length_seed, max_steps))
+
+    if workers == 1:
+        lengths = [_profile_task(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            lengths = list(pool.map(_profile_task, tasks))
+
+    return ComplexityProfile(
+        lengths=lengths,
+        time=_fit_power([(p.length, p.max_steps) for p in lengths]),
+        space=_fit_power([(p.length, p.max_cells) for p in lengths]),
+    )
+
+# ============================================================================
+# TRAZAS BINARIAS EN DISCO (ESCRITURA EN STREAMING Y LECTURA CON SEEK)
+# ============================================================================
+#
+# Formato:
+#   "TMTRACE1" | u32 largo + cabecera JSON (estados, símbolos, δ, entrada)
+#   Registros, en el orden en que ocurren:
+#     'S' u32 índice de transición, i8 Δcabezal, u16 símbolo escrito   (8 bytes)
+#     'K' u64 paso, u32 estado, u32 cache, i64 cabezal, i64 celda más a la
+#         izquierda, u32 n, n × u16 celdas                      (keyframe)
+#   Pie JSON (índice de keyframes y veredicto) | u64 offset del pie | "TMTREND1"
+#
+# Las posiciones son absolutas: la celda 0 es el blanco a la izquierda de la
+# entrada. El keyframe del paso 0 siempre existe.
+
+_TRACE_MAGIC = b"TMTRACE1"
+_TRACE_END = b"TMTREND1"
+_TRACE_STEP = struct.Struct("<cIbH")
+_TRACE_KEY = struct.Struct("<cQIIqqI")
+_TRACE_TAIL = struct.Struct("<Q8s")
+
+
+class TraceWriter:
+    """Escribe la traza de un MachineRun a medida que avanza.
+
+    Se engancha a `run.trace`; cada paso cuesta un registro de 8 bytes y cada
+    `keyframe_interval` pasos se guarda la configuración completa.
+    """
+
+    def __init__(self, path: str, run: MachineRun, keyframe_interval: int = 4096):
+        self.path = path
+        self.run = run
+        self.keyframe_interval = keyframe_interval
+        tm = run.tm
+
+        self.states: List[str] = list(dict.fromkeys(
+            list(tm.states) + [tm.initial_state, tm.final_state] +
+            [s for t in tm.transitions for s in (t.params.initial_state, t.output.final_state)]
+        ))
+        self.state_codes = {s: i for i, s in enumerate(self.states)}
+        # Mismos códigos que la cinta compacta del run (la entrada ya está registrada)
+        self.symbols: List[Optional[str]] = list(tm.codec.symbols)
+        self.symbol_codes = tm.codec.codes
+        self.transition_codes = {id(t): i for i, t in enumerate(tm.transitions)}
+
+        header = {
+            "input": run.input_string,
+            "states": self.states,
+            "symbols": self.symbols,
+            "final_state": tm.final_state,
+            "keyframe_interval": keyframe_interval,
+            "transitions": [
+                [self.state_codes[t.output.final_state],
+                 self.symbol_codes[t.output.mem_cache_value],
+                 self.symbol_codes[t.output.tape_output],
+                 _MOVE_DELTA[t.output.tape_displacement]]
+                for t in tm.transitions
+            ],
+        }
+        raw = json.dumps(header).encode("utf-8")
+        self._file = open(path, "wb", buffering=1 << 20)
+        self._file.write(_TRACE_MAGIC + struct.pack("<I", len(raw)) + raw)
+        self.keyframes: List[Tuple[int, int]] = []
+        self.steps = run.steps
+        self._keyframe(run.tape, run.offset, run.head_position, run.state, run.mem_cache)
+        run.trace = self
+
+    def _keyframe(self, tape: array, offset: int, head_position: int,
+                  state: str, mem_cache: Optional[str]) -> None:
+        if isinstance(tape, PagedTape):
+            # Cinta dispersa: se guarda la ventana entre los extremos no blancos
+            # (su cabezal es absoluto; se pasa a índice dentro de la ventana)
+            tape, offset = tape.window(head_position)
+            head_position += offset
+        self.keyframes.append((self.steps, self._file.tell()))
+        codes = tape if tape.typecode == "H" else array("H", tape)
+        self._file.write(_TRACE_KEY.pack(b"K", self.steps, self.state_codes[state],
+                                         self.symbol_codes[mem_cache],
+                                         head_position - offset, -offset, len(codes)))
+        self._file.write(codes.tobytes())
+
+    def record(self, transition: Transition, tape: array, offset: int,
+               head_position: int) -> None:
+        out = transition.output
+        self.steps += 1
+        self._file.write(_TRACE_STEP.pack(b"S", self.transition_codes[id(transition)],
+                                          _MOVE_DELTA[out.tape_displacement],
+                                          self.symbol_codes[out.tape_output]))
+        if self.steps % self.keyframe_interval == 0:
+            self._keyframe(tape, offset, head_position, out.final_state, out.mem_cache_value)
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        run = self.run
+        footer = {
+            "steps": self.steps,
+            "halted": run.halted,
+            "accepted": run.accepted,
+            "no_transition": run.no_transition,
+            "keyframes": self.keyframes,
+        }
+        raw = json.dumps(footer).encode("utf-8")
+        footer_offset = self._file.tell()
+        self._file.write(raw)
+        self._file.write(_TRACE_TAIL.pack(footer_offset, _TRACE_END))
+        self._file.close()
+        if run.trace is self:
+            run.trace = None
+
+
+def record_trace(tm: TuringMachine, input_string: str, path: str, max_steps: int = 10000,
+                 keyframe_interval: int = 4096, sparse: bool = False) -> Tuple[bool, int]:
+    """Simula sin guardar IDs en memoria y deja la traza completa en `path`."""
+    run = MachineRun(tm, input_string, record_ids=False, sparse=sparse)
+    writer = TraceWriter(path, run, keyframe_interval)
+    try:
+        run.run_until(max_steps)
+    finally:
+        writer.close()
+    return run.result()
+
+
+class TraceReader:
+    """Lee una traza binaria; cualquier paso se reconstruye con un seek al keyframe previo."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        if self._file.read(len(_TRACE_MAGIC)) != _TRACE_MAGIC:
+            raise ValueError(f"'{path}' no es una traza binaria de MT")
+        (size,) = struct.unpack("<I", self._file.read(4))
+        self.header = json.loads(self._file.read(size).decode("utf-8"))
+        self._file.seek(-_TRACE_TAIL.size, os.SEEK_END)
+        footer_offset, end = _TRACE_TAIL.unpack(self._file.read(_TRACE_TAIL.size))
+        if end != _TRACE_END:
+            raise ValueError(f"La traza '{path}' está incompleta (sin pie/índice)")
+        self._file.seek(footer_offset)
+        self.footer = json.loads(self._file.read(
+            os.path.getsize(path) - _TRACE_TAIL.size - footer_offset).decode("utf-8"))
+        self.states: List[str] = self.header["states"]
+        self.symbols: List[Optional[str]] = self.header["symbols"]
+        self.transitions: List[List[int]] = self.header["transitions"]
+        self._keyframe_steps = [k for k, _ in self.footer["keyframes"]]
+        self._index: Optional['TraceIndex'] = None
+
+    def close(self) -> None:
+        self._file.close()
+
+    def index(self) -> 'TraceIndex':
+        """Índice de consultas de la traza (se construye una vez y se reutiliza)."""
+        if self._index is None:
+            self._index = TraceIndex(self)
+        return self._index
+
+    def __enter__(self) -> 'TraceReader':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    @property
+    def steps(self) -> int:
+        return self.footer["steps"]
+
+    @property
+    def accepted(self) -> bool:
+        return self.footer["accepted"]
+
+    def __len__(self) -> int:
+        # Igual que len(ids) de simulate (incluye la ID "(SIN δ)" si aplica)
+        return self.steps + 1 + (1 if self.footer["no_transition"] else 0)
+
+    def __getitem__(self, step: int) -> InstantaneousDescription:
+        if step < 0:
+            step += len(self)
+        if not 0 <= step < len(self):
+            raise IndexError(step)
+        return next(self.descriptions(step, step + 1))
+
+    def descriptions(self, start: int = 0, stop: Optional[int] = None) -> Iterator[InstantaneousDescription]:
+        """Genera las IDs de [start, stop) de forma perezosa."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return
+        last_real = min(stop - 1, self.steps)
+        k = bisect.bisect_right(self._keyframe_steps, min(start, self.steps)) - 1
+        kstep, koffset = self.footer["keyframes"][k]
+
+        f = self._file
+        f.seek(koffset)
+        _, step, state, cache, head, lo, n = _TRACE_KEY.unpack(f.read(_TRACE_KEY.size))
+        cells = array("H")
+        cells.frombytes(f.read(2 * n))
+        cells = list(cells)
+        hi = lo + n - 1
+
+        def describe(at_step: int, label: Optional[str] = None) -> InstantaneousDescription:
+            return InstantaneousDescription(
+                state=label or self.states[state],
+                tape=[self.symbols[c] for c in cells],
+                head_position=head - lo,
+                mem_cache=self.symbols[cache],
+                step=at_step,
+            )
+
+        if step >= start:
+            yield describe(step)
+        while step < last_real:
+            # Los registros entre keyframes son de tamaño fijo; el siguiente
+            # keyframe (si lo hay) se salta por su tamaño.
+            tag = f.read(1)
+            if tag == b"K":
+                _, _, _, _, _, _, n = _TRACE_KEY.unpack(tag + f.read(_TRACE_KEY.size - 1))
+                f.seek(2 * n, os.SEEK_CUR)
+                continue
+            _, t_index, delta, written = _TRACE_STEP.unpack(tag + f.read(_TRACE_STEP.size - 1))
+            state, cache = self.transitions[t_index][0], self.transitions[t_index][1]
+            cells[head - lo] = written
+            head += delta
+            if head < lo:
+                cells.insert(0, 0)
+                lo = head
+            elif head > hi:
+                cells.append(0)
+                hi = head
+            step += 1
+            if step >= start:
+                yield describe(step)
+
+        if stop > self.steps + 1:
+            yield describe(self.steps + 1, f"{self.states[state]} (SIN δ)")
+
+    def export_jsonl(self, path: str, start: int = 0, stop: Optional[int] = None) -> int:
+        count = 0
+        with open(path, "w", encoding="utf-8") as out:
+            for d in self.descriptions(start, stop):
+                out.write(json.dumps({
+                    "step": d.step, "state": d.state, "mem_cache": d.mem_cache,
+                    "head_position": d.head_position, "tape": d.tape,
+                }, ensure_ascii=False) + "\n")
+                count += 1
+        return count
+
+    def export_csv(self, path: str, start: int = 0, stop: Optional[int] = None) -> int:
+        count = 0
+        with open(path, "w", encoding="utf-8", newline="") as out:
+            writer = csv.writer(out)
+            writer.writerow(["step", "state", "mem_cache", "head_position", "tape"])
+            for d in self.descriptions(start, stop):
+                writer.writerow([d.step, d.state, _B(d.mem_cache), d.head_position,
+                                 "".join(_B(x) for x in d.tape)])
+                count += 1
+        return count
+
+
+class TraceIndex:
+    """Consultas sobre una traza: pasos por estado/símbolo, escrituras por celda e
+    intervalos del cabezal.
+
+    Se construye en una sola pasada vectorizada sobre los registros y después
+    cada consulta es una búsqueda binaria en arreglos ordenados. Cubre las IDs
+    de la traza (sin la ID "(SIN δ)") y devuelve números de paso que sirven
+    directo para reader[paso].
+    """
+
+    def __init__(self, reader: TraceReader):
+        self.states = reader.states
+        self.symbols = reader.symbols
+        self._state_codes = {s: i for i, s in enumerate(self.states)}
+        self._symbol_codes = {s: i for i, s in enumerate(self.symbols)}
+
+        # Registros 'S' de cada tramo entre keyframes (tamaño fijo, se leen en bloque)
+        f = reader._file
+        keyframes = reader.footer["keyframes"]
+        self.first_step = keyframes[0][0]
+        chunks = []
+        for k, (kstep, koffset) in enumerate(keyframes):
+            f.seek(koffset)
+            _, _, state, cache, head, lo, n = _TRACE_KEY.unpack(f.read(_TRACE_KEY.size))
+            if k == 0:
+                first_state, first_cache, first_head, first_lo = state, cache, head, lo
+                first_cells = np.frombuffer(f.read(2 * n), dtype="<u2")
+                # Cinta del primer keyframe (celda más a la izquierda = initial_left)
+                self.initial_cells, self.initial_left = first_cells, first_lo
+            else:
+                f.seek(2 * n, os.SEEK_CUR)
+            until = keyframes[k + 1][0] if k + 1 < len(keyframes) else reader.steps
+            chunks.append(f.read(_TRACE_STEP.size * (until - kstep)))
+        records = np.frombuffer(b"".join(chunks), dtype=[("tag", "S1"), ("t", "<u4"),
+                                                          ("delta", "i1"), ("written", "<u2")])
+        outputs = np.array([t[:2] for t in reader.transitions], dtype=np.int64).reshape(-1, 2)
+        n = len(records)
+
+        # Por ID (paso first_step + i): estado, cache, cabezal absoluto y símbolo leído
+        self.state_at = np.empty(n + 1, dtype=np.int64)
+        self.state_at[0] = first_state
+        self.state_at[1:] = outputs[records["t"], 0]
+        self.cache_at = np.empty(n + 1, dtype=np.int64)
+        self.cache_at[0] = first_cache
+        self.cache_at[1:] = outputs[records["t"], 1]
+        self.head_at = np.empty(n + 1, dtype=np.int64)
+        self.head_at[0] = first_head
+        np.cumsum(records["delta"], out=self.head_at[1:])
+        self.head_at[1:] += first_head
+        self.written = records["written"].astype(np.int64)
+
+        # Símbolo bajo el cabezal en cada ID: la última escritura previa en esa
+        # celda o, si no la hay, el valor del keyframe inicial. Se ordenan
+        # escrituras y lecturas por (celda, paso) y se arrastra la última escritura.
+        cells = np.concatenate([self.head_at[:-1], self.head_at])
+        times = np.concatenate([np.arange(1, n + 1), np.arange(0, n + 1)])
+        is_read = np.concatenate([np.zeros(n, dtype=bool), np.ones(n + 1, dtype=bool)])
+        order = np.lexsort((is_read, times, cells))
+        positions = np.where(is_read[order], -1, np.arange(2 * n + 1))
+        last_write = np.maximum.accumulate(positions)
+        reads = order[is_read[order]] - n
+        found = last_write[is_read[order]]
+        hit = found >= 0
+        hit[hit] = cells[order[found[hit]]] == cells[order][is_read[order]][hit]
+        initial = cells[n:][reads] - first_lo
+        inside = (initial >= 0) & (initial < len(first_cells))
+        self.read_at = np.zeros(n + 1, dtype=np.int64)
+        self.read_at[reads[inside]] = first_cells[initial[inside]]
+        self.read_at[reads[hit]] = self.written[order[found[hit]]]
+
+        # Índices ordenados (argsort estable: dentro de cada clave, pasos crecientes)
+        self._by_state = np.argsort(self.state_at * len(self.symbols) + self.read_at, kind="stable")
+        self._state_keys = (self.state_at * len(self.symbols) + self.read_at)[self._by_state]
+        self._by_symbol = np.argsort(self.read_at, kind="stable")
+        self._symbol_keys = self.read_at[self._by_symbol]
+        self._by_cell = np.argsort(self.head_at[:-1], kind="stable")
+        self._cell_keys = self.head_at[:-1][self._by_cell]
+        self._by_head = np.argsort(self.head_at, kind="stable")
+        self._head_keys = self.head_at[self._by_head]
+
+    def __len__(self) -> int:
+        return len(self.state_at)
+
+    @staticmethod
+    def _slice(keys: np.ndarray, lo: int, hi: int) -> Tuple[int, int]:
+        # Rango [lo, hi] (inclusive) de claves en un arreglo ordenado
+        return (int(np.searchsorted(keys, lo, side="left")),
+                int(np.searchsorted(keys, hi, side="right")))
+
+    def steps_where(self, state: Optional[str] = None, symbol: Optional[str] = None,
+                    cache: Optional[str] = None) -> List[int]:
+        """Pasos cuya ID cumple las condiciones dadas (None = cualquiera; el blanco es 'B')."""
+        width = len(self.symbols)
+        if symbol is not None:
+            code = self._symbol_codes.get(_normalize_symbol(symbol))
+            if code is None:
+                return []
+        if state is not None:
+            s = self._state_codes.get(state)
+            if s is None:
+                return []
+            lo, hi = (s * width, s * width + width - 1) if symbol is None else \
+                     (s * width + code, s * width + code)
+            a, b = self._slice(self._state_keys, lo, hi)
+            found = np.sort(self._by_state[a:b])
+        elif symbol is not None:
+            a, b = self._slice(self._symbol_keys, code, code)
+            found = self._by_symbol[a:b]
+        else:
+            found = np.arange(len(self))
+        if cache is not None:
+            c = self._symbol_codes.get(_normalize_symbol(cache))
+            if c is None:
+                return []
+            found = found[self.cache_at[found] == c]
+        return (found + self.first_step).tolist()
+
+    def writes(self, cell: int, changes_only: bool = False) -> List[Tuple[int, Optional[str], Optional[str]]]:
+        """Historial de escrituras en la celda absoluta `cell`: (paso, símbolo previo, símbolo escrito)."""
+        a, b = self._slice(self._cell_keys, cell, cell)
+        found = self._by_cell[a:b]
+        before, after = self.read_at[found], self.written[found]
+        if changes_only:
+            found, before, after = found[before != after], before[before != after], after[before != after]
+        symbols = self.symbols
+        return [(int(i) + 1 + self.first_step, symbols[x], symbols[y])
+                for i, x, y in zip(found, before, after)]
+
+    def last_write(self, cell: int, before: Optional[int] = None) -> Optional[int]:
+        """Último paso (anterior o igual a `before`) que escribió en `cell`, o None."""
+        a, b = self._slice(self._cell_keys, cell, cell)
+        found = self._by_cell[a:b] + 1 + self.first_step
+        if before is not None:
+            found = found[:np.searchsorted(found, before, side="right")]
+        return int(found[-1]) if len(found) else None
+
+    def _head_slice(self, lo: Optional[int], hi: Optional[int]) -> Tuple[int, int]:
+        keys = self._head_keys
+        return (0 if lo is None else int(np.searchsorted(keys, lo, side="left")),
+                len(keys) if hi is None else int(np.searchsorted(keys, hi, side="right")))
+
+    def head_steps(self, lo: Optional[int] = None, hi: Optional[int] = None) -> List[int]:
+        """Pasos con el cabezal en la posición absoluta [lo, hi] (None = sin cota)."""
+        a, b = self._head_slice(lo, hi)
+        return (np.sort(self._by_head[a:b]) + self.first_step).tolist()
+
+    def head_intervals(self, lo: Optional[int] = None,
+                       hi: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Tramos maximales de pasos consecutivos (inicio, fin) con el cabezal en [lo, hi]."""
+        a, b = self._head_slice(lo, hi)
+        steps = np.sort(self._by_head[a:b]) + self.first_step
+        if not len(steps):
+            return []
+        breaks = np.flatnonzero(np.diff(steps) != 1)
+        starts = np.concatenate([steps[:1], steps[breaks + 1]])
+        ends = np.concatenate([steps[breaks], steps[-1:]])
+        return list(zip(starts.tolist(), ends.tolist()))
+
+    def head_duration(self, lo: Optional[int] = None, hi: Optional[int] = None) -> int:
+        """Cantidad de IDs con el cabezal en [lo, hi] (p. ej. hi=-1: a la izquierda de la celda 0)."""
+        a, b = self._head_slice(lo, hi)
+        return b - a
+
+
+# ============================================================================
+# DIAGRAMA ESPACIO-TIEMPO (IMAGEN DE TODA LA EJECUCIÓN)
+# ============================================================================
+
+# Colores por código de símbolo (0 = blanco); los demás se repiten en ciclo
+_DIAGRAM_PALETTE = np.array([
+    (255, 255, 255), (31, 119, 180), (255, 127, 14), (44, 160, 44), (148, 103, 189),
+    (140, 86, 75), (227, 119, 194), (127, 127, 127), (188, 189, 34), (23, 190, 207),
+    (174, 199, 232), (152, 223, 138), (197, 176, 213),
+], dtype=np.uint8)
+_DIAGRAM_HEAD = np.array((214, 39, 40), dtype=np.uint8)
+
+
+def diagram_color(code: int) -> str:
+    """Color (hex) del símbolo con código `code` en el diagrama espacio-tiempo."""
+    r, g, b = _DIAGRAM_PALETTE[0 if code == 0 else 1 + (code - 1) % (len(_DIAGRAM_PALETTE) - 1)]
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def space_time_diagram(index: TraceIndex, max_rows: int = 600, max_cols: int = 800,
+                       max_scale: int = 12) -> np.ndarray:
+    """Imagen RGB de la traza: una fila por paso, una columna por celda y el cabezal en rojo.
+
+    Con más pasos o celdas que píxeles se submuestrea: cada fila muestra la
+    cinta al inicio de su bloque de pasos y sombrea todo lo que recorrió el
+    cabezal dentro del bloque. Las ejecuciones cortas se amplían hasta
+    `max_scale` píxeles por celda.
+    """
+    heads = index.head_at
+    n = len(heads)
+    initial = index.initial_cells
+    left = min(int(heads.min()), index.initial_left)
+    right = max(int(heads.max()), index.initial_left + len(initial) - 1)
+    tape = np.zeros(right - left + 1, dtype=np.int64)
+    tape[index.initial_left - left:index.initial_left - left + len(initial)] = initial
+
+    row_step = -(-n // max_rows)
+    col_step = -(-len(tape) // max_cols)
+    starts = np.arange(0, n, row_step)
+    columns = np.arange(0, len(tape), col_step)
+    write_cells = heads[:-1] - left
+    written = index.written
+
+    grid = np.empty((len(starts), len(columns)), dtype=np.int64)
+    applied = 0
+    for r, s in enumerate(starts):
+        if s > applied:
+            # Escrituras de los pasos applied+1..s; si una celda se escribe varias
+            # veces gana la última (np.unique sobre el tramo invertido)
+            cells, first = np.unique(write_cells[applied:s][::-1], return_index=True)
+            tape[cells] = written[applied:s][::-1][first]
+            applied = s
+        grid[r] = tape[columns]
+
+    codes = np.where(grid == 0, 0, 1 + (grid - 1) % (len(_DIAGRAM_PALETTE) - 1))
+    image = _DIAGRAM_PALETTE[codes]
+
+    # Recorrido del cabezal en cada bloque (sombreado) y posición al inicio (sólida)
+    lo = (np.minimum.reduceat(heads, starts) - left) // col_step
+    hi = (np.maximum.reduceat(heads, starts) - left) // col_step
+    at = (heads[starts] - left) // col_step
+    col = np.arange(len(columns))
+    swept = (col[None, :] >= lo[:, None]) & (col[None, :] <= hi[:, None])
+    image[swept] = (image[swept] // 2 + _DIAGRAM_HEAD // 2)
+    image[np.arange(len(starts)), at] = _DIAGRAM_HEAD
+
+    scale = max(1, min(max_scale, max_cols // len(columns), max_rows // len(starts)))
+    if scale > 1:
+        image = image.repeat(scale, axis=0).repeat(scale, axis=1)
+    return image
+
+
+def run_space_time(tm: TuringMachine, input_string: str, max_steps: int = 10000,
+                   max_rows: int = 600, max_cols: int = 800) -> np.ndarray:
+    """Simula con traza en un archivo temporal y devuelve su diagrama espacio-tiempo."""
+    fd, path = tempfile.mkstemp(suffix=".trace")
+    os.close(fd)
+    try:
+        record_trace(tm, input_string, path, max_steps)
+        with TraceReader(path) as reader:
+            return space_time_diagram(reader.index(), max_rows, max_cols)
+    finally:
+        os.remove(path)
+
+
+# ============================================================================
+# INSTANTÁNEAS DE CONFIGURACIÓN (GUARDAR Y REANUDAR EN DISCO)
+# ============================================================================
+#
+# Formato: "TMSNAP01" | u32 largo + JSON (huella de la MT, entrada, estado,
+# cache, pasos, cabezal, símbolos...) | n × u16 celdas (little-endian).
+# Las celdas van en códigos del codec de quien guardó; al cargar se traducen
+# por símbolo al codec de la MT destino, así que sirve en otro proceso o nodo.
+
+_SNAPSHOT_MAGIC = b"TMSNAP01"
+
+
+def save_snapshot(run: MachineRun, path: str) -> None:
+    """Guarda la configuración viva de `run` de forma atómica (archivo temporal + os.replace)."""
+    if run.sparse:
+        codes, offset = run.tape.window(run.head_position)
+        head = run.head_position + offset
+    else:
+        codes, offset, head = run.tape, run.offset, run.head_position
+    cells = np.frombuffer(codes, dtype=codes.typecode).astype("<u2")
+    last = run.last_transition
+    meta = {
+        "fingerprint": run.tm.fingerprint(),
+        "input": run.input_string,
+        "input_sha256": run.input_digest,
+        "state": run.state,
+        "mem_cache": run.mem_cache,
+        "steps": run.steps,
+        "head_position": head - offset,     # absoluta
+        "left": -offset,                    # posición absoluta de la primera celda
+        "halted": run.halted,
+        "accepted": run.accepted,
+        "no_transition": run.no_transition,
+        "last_transition": -1 if last is None else next(
+            i for i, t in enumerate(run.tm.transitions) if t is last),
+        "symbols": list(run.symbols),
+    }
+    raw = json.dumps(meta).encode("utf-8")
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_SNAPSHOT_MAGIC + struct.pack("<I", len(raw)) + raw)
+        f.write(cells.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_snapshot(tm: TuringMachine, path: str, record_ids: bool = False,
+                  sparse: bool = False) -> MachineRun:
+    """Reconstruye la ejecución guardada en `path` para continuarla con `tm`.
+
+    La MT debe tener la misma huella que la que guardó. Con `record_ids`, las
+    IDs empiezan en el paso de la instantánea.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(_SNAPSHOT_MAGIC)) != _SNAPSHOT_MAGIC:
+            raise ValueError(f"'{path}' no es una instantánea de MT")
+        (size,) = struct.unpack("<I", f.read(4))
+        meta = json.loads(f.read(size).decode("utf-8"))
+        cells = np.frombuffer(f.read(), dtype="<u2")
+    if meta["fingerprint"] != tm.fingerprint():
+        raise ValueError("La instantánea es de otra MT (la huella no coincide)")
+
+    # Traducir códigos del codec que guardó al de esta MT (identidad si coinciden)
+    mapping = [tm.codec.code(sym) for sym in meta["symbols"]]
+    typecode = tm.codec.typecode
+    if mapping != list(range(len(mapping))):
+        cells = np.asarray(mapping, dtype=np.uint16)[cells]
+    codes = array(typecode, cells.astype(typecode).tobytes())
+
+    run = MachineRun(tm, "", record_ids=False, sparse=sparse)
+    run.input_string = meta["input"]
+    run.input_digest = meta.get("input_sha256")
+    head = meta["head_position"]
+    if sparse:
+        run.tape = PagedTape.from_codes(codes, codes.typecode, run.tape.page_size, start=meta["left"])
+        run.head_position = head
+    else:
+        run.tape = codes
+        run.offset = -meta["left"]
+        run.head_position = head + run.offset
+    run.symbols = tm.codec.symbols
+    run.state = meta["state"]
+    run.mem_cache = meta["mem_cache"]
+    run.steps = meta["steps"]
+    run.halted = meta["halted"]
+    run.accepted = meta["accepted"]
+    run.no_transition = meta["no_transition"]
+    if meta["last_transition"] >= 0:
+        run.last_transition = tm.transitions[meta["last_transition"]]
+    if record_ids:
+        run.ids = [run.snapshot()]
+    return run
+
+
+def run_with_snapshots(tm: TuringMachine, input_string: InputData, path: str, max_steps: int,
+                       every_steps: int = 1_000_000,
+                       every_seconds: Optional[float] = None) -> MachineRun:
+    """Ejecución larga que guarda una instantánea cada `every_steps` pasos (o cada
+    `every_seconds` segundos) y, si `path` ya existe, continúa desde ahí.
+
+    Si el proceso muere, volver a llamar con los mismos argumentos retoma
+    desde la última instantánea; al terminar deja la configuración final.
+    """
+    if os.path.exists(path):
+        run = load_snapshot(tm, path)
+        if isinstance(input_string, str):
+            same = run.input_string == input_string
+        else:
+            same = run.input_string is None and run.input_digest == input_digest(input_string)
+        if not same:
+            raise ValueError("La instantánea corresponde a otra entrada")
+    else:
+        run = MachineRun(tm, input_string, record_ids=False)
+    last_save = time.perf_counter()
+    while not run.halted and run.steps < max_steps:
+        target = min(max_steps, run.steps + every_steps)
+        if every_seconds is None:
+            run.run_until(target)
+        else:
+            # Tramos cortos para revisar el reloj sin frenar el bucle
+            while not run.halted and run.steps < target:
+                run.advance(min(65536, target - run.steps))
+                if time.perf_counter() - last_save >= every_seconds:
+                    break
+        save_snapshot(run, path)
+        last_save = time.perf_counter()
+    if not os.path.exists(path):
+        save_snapshot(run, path)
+    return run
+
+
+# ============================================================================
+# REPRODUCCIÓN PASO A PASO (AVANZAR Y RETROCEDER SIN TRAZA)
+# ============================================================================
+
+def _copy_tape(tape: Union[array, PagedTape]) -> Union[array, PagedTape]:
+    if isinstance(tape, PagedTape):
+        return PagedTape(tape.typecode, tape.page_size, {n: page[:] for n, page in tape.pages.items()})
+    return tape[:]
+
+
+class RunPlayer:
+    """Ejecución viva para reproducirla hacia adelante y hacia atrás, sin guardar la traza.
+
+    Cada `keyframe_every` pasos se guarda una copia de la configuración.
+    Retroceder restaura la última copia anterior al paso pedido y avanza
+    desde ahí (a lo sumo `keyframe_every` pasos). Si las copias pasan de
+    `max_keyframes` se descarta una de cada dos y el intervalo se duplica,
+    así que la memoria queda acotada para ejecuciones de cualquier largo.
+    """
+
+    _FIELDS = ('steps', 'head_position', 'offset', 'state', 'mem_cache', 'last_transition',
+               'halted', 'accepted', 'no_transition', 'stationary_loop')
+
+    def __init__(self, tm: TuringMachine, input_string: str, sparse: bool = False,
+                 keyframe_every: int = 1024, max_keyframes: int = 256):
+        if keyframe_every <= 0 or max_keyframes < 2:
+            raise ValueError("keyframe_every debe ser positivo y max_keyframes al menos 2")
+        self.tm = tm
+        self.input_string = input_string
+        self.sparse = sparse
+        self.keyframe_every = keyframe_every
+        self.max_keyframes = max_keyframes
+        self.run = MachineRun(tm, input_string, record_ids=False, sparse=sparse)
+        self.keyframes: List[Tuple[Any, ...]] = [self._capture()]
+
+    @property
+    def step(self) -> int:
+        return self.run.steps
+
+    @property
+    def head(self) -> int:
+        """Posición absoluta del cabezal (la celda 0 es el blanco a la izquierda de la entrada)."""
+        run = self.run
+        return run.head_position if run.sparse else run.head_position - run.offset
+
+    def _capture(self) -> Tuple[Any, ...]:
+        run = self.run
+        return (_copy_tape(run.tape),) + tuple(getattr(run, f) for f in self._FIELDS)
+
+    def _restore(self, frame: Tuple[Any, ...]) -> None:
+        run = MachineRun(self.tm, "", record_ids=False, sparse=self.sparse)
+        run.input_string = self.input_string
+        run.tape = _copy_tape(frame[0])
+        for field, value in zip(self._FIELDS, frame[1:]):
+            setattr(run, field, value)
+        self.run = run
+
+    def forward(self, n: int = 1) -> bool:
+        """Avanza hasta n pasos guardando copias por el camino; True si la MT se detuvo."""
+        run = self.run
+        target = run.steps + n
+        while not run.halted and run.steps < target:
+            mark = (run.steps // self.keyframe_every + 1) * self.keyframe_every
+            run.run_until(min(target, mark))
+            if run.steps == mark and mark > self.keyframes[-1][1]:
+                self.keyframes.append(self._capture())
+                if len(self.keyframes) > self.max_keyframes:
+                    self.keyframe_every *= 2
+                    self.keyframes = [f for f in self.keyframes if f[1] % self.keyframe_every == 0]
+        return run.halted
+
+    def seek(self, step: int) -> bool:
+        """Lleva la ejecución al paso `step` (o hasta donde se detenga antes)."""
+        step = max(0, step)
+        if step < self.run.steps:
+            k = bisect.bisect_right([f[1] for f in self.keyframes], step) - 1
+            self._restore(self.keyframes[k])
+        return self.forward(step - self.run.steps)
+
+    def back(self, n: int = 1) -> bool:
+        return self.seek(self.run.steps - n)
+
+    def window(self, radius: int = 20) -> Tuple[int, List[Optional[str]]]:
+        """Celdas alrededor del cabezal: (posición absoluta de la primera, símbolos)."""
+        run = self.run
+        symbols = run.symbols
+        if run.sparse:
+            codes = [run.tape[p] for p in range(run.head_position - radius, run.head_position + radius + 1)]
+        else:
+            tape, n = run.tape, len(run.tape)
+            codes = [tape[i] if 0 <= i < n else 0
+                     for i in range(run.head_position - radius, run.head_position + radius + 1)]
+        return self.head - radius, [symbols[c] for c in codes]
+
+
+# ============================================================================
+# EJECUCIONES REANUDABLES (CORTADAS POR EL LÍMITE DE PASOS)
+# ============================================================================
+
+class RunCache:
+    """Ejecuciones cortadas antes de detenerse, por (huella de la MT, entrada, modo).
+
+    Da igual qué límite las cortó (pasos, tiempo o plazo global). Al repetir o
+    subir el límite, la ejecución guardada continúa desde su última
+    configuración en vez de empezar de cero: el resultado es el mismo que el
+    de una ejecución nueva y solo cuesta los pasos extra. Cada ejecución se
+    entrega a un solo consumidor (take la saca de la caché).
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.runs: Dict[Tuple[str, str, bool, bool], MachineRun] = {}
+        self.hits = 0
+        self.saved_steps = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(tm: TuringMachine, input_string: str, record_ids: bool,
+             sparse: bool) -> Tuple[str, str, bool, bool]:
+        return (tm.fingerprint(), input_string, record_ids, sparse)
+
+    def take(self, tm: TuringMachine, input_string: str, max_steps: int,
+             record_ids: bool = True, sparse: bool = False) -> MachineRun:
+        """Ejecución guardada que aún no pasa de max_steps, o una nueva."""
+        key = self._key(tm, input_string, record_ids, sparse)
+        with self._lock:
+            run = self.runs.get(key)
+            if run is None or run.steps > max_steps:
+                return MachineRun(tm, input_string, record_ids=record_ids, sparse=sparse)
+            del self.runs[key]
+            self.hits += 1
+            self.saved_steps += run.steps
+        if run.ids is not None:
+            # El resultado anterior conserva su propia lista de IDs
+            run.ids = list(run.ids)
+        return run
+
+    def store(self, run: MachineRun) -> None:
+        if run.halted:
+            return
+        key = self._key(run.tm, run.input_string, run.ids is not None, run.sparse)
+        with self._lock:
+            self.runs.pop(key, None)
+            self.runs[key] = run
+            while len(self.runs) > self.max_entries:
+                del self.runs[next(iter(self.runs))]
+
+    def simulate(self, tm: TuringMachine, input_string: str,
+                 max_steps: int = 10000) -> Tuple[bool, List[InstantaneousDescription], Optional[Transition]]:
+        """Como tm.simulate, reanudando desde la caché y guardando si se corta por pasos."""
+        run = self.take(tm, input_string, max_steps)
+        run.run_until(max_steps)
+        self.store(run)
+        return run.accepted, run.ids, run.last_transition
+
+
+# ============================================================================
+# PLANIFICADOR ROUND-ROBIN CON LÍMITES DE TIEMPO
+# ============================================================================
+
+CUTOFF_STEPS = "pasos"
+CUTOFF_TIME = "tiempo"
+CUTOFF_DEADLINE = "plazo global"
+
+
+@dataclass
+class ScheduledResult:
+    index: int
+    input_string: str
+    accepted: bool
+    steps: int
+    cutoff: Optional[str]
+    elapsed: float
+    ids: Optional[List[InstantaneousDescription]]
+    last_transition: Optional[Transition]
+    resumed_from: int = 0           # pasos reutilizados de una ejecución anterior (RunCache)
+    state: str = ""                 # estado final (como el de la última ID)
+
+
+def round_robin(tm: TuringMachine, strings: Sequence[str], max_steps: int,
+                quantum: int = 500,
+                string_timeout: Optional[float] = None,
+                deadline: Optional[float] = None,
+                record_ids: bool = False,
+                on_slice: Optional[Callable[[int], bool]] = None,
+                sparse: bool = False,
+                run_cache: Optional[RunCache] = None,
+                max_active: Optional[int] = None) -> Iterator[ScheduledResult]:
+    """Intercala las cadenas en tramos de `quantum` pasos y emite cada una al terminar.
+
+    Las entradas cortas terminan primero aunque otra no se detenga. Además del
+    límite de pasos, cada cadena puede tener un tiempo máximo (`string_timeout`,
+    en segundos de reloj) y el lote un plazo global (`deadline`). El
+    campo `cutoff` indica qué límite cortó la cadena (None si se detuvo sola).
+    `on_slice(pasos)` se llama tras cada tramo; si devuelve False se abandona el lote.
+    Con `run_cache`, las cadenas cortadas (por pasos, tiempo o plazo) o
+    abandonadas se guardan y una ejecución posterior las continúa (ver
+    RunCache). Las que el plazo global alcanza sin haber empezado se informan
+    con 0 pasos, sin sacar de la caché lo que ya tuvieran avanzado.
+    Con `max_active`, solo esa cantidad de cadenas está en curso a la vez y
+    las demás entran conforme terminan, así que el primer resultado no espera
+    a preparar todo el lote.
+    """
+    started = time.perf_counter()
+    waiting = deque(enumerate(strings))
+    queue: deque = deque()
+    resumed_from: Dict[int, int] = {}
+
+    def start(i: int, s: str) -> MachineRun:
+        if run_cache is None:
+            run = MachineRun(tm, s, record_ids=record_ids, sparse=sparse)
+        else:
+            run = run_cache.take(tm, s, max_steps, record_ids=record_ids, sparse=sparse)
+        resumed_from[i] = run.steps
+        return run
+
+    def admit() -> None:
+        while waiting and (max_active is None or len(queue) < max_active):
+            i, s = waiting.popleft()
+            queue.append((i, start(i, s), 0.0))
+
+    def finished(i: int, run: MachineRun, elapsed: float, cutoff: Optional[str]) -> ScheduledResult:
+        accepted, steps = run.result() if run.halted else (False, run.steps)
+        if cutoff is not None and run_cache is not None:
+            run_cache.store(run)
+        return ScheduledResult(index=i, input_string=run.input_string, accepted=accepted,
+                               steps=steps, cutoff=cutoff, elapsed=elapsed,
+                               ids=run.ids, last_transition=run.last_transition,
+                               resumed_from=resumed_from[i],
+                               state=f"{run.state} (SIN δ)" if run.no_transition else run.state)
+
+    def not_started(i: int, s: str) -> ScheduledResult:
+        return ScheduledResult(index=i, input_string=s, accepted=False, steps=0,
+                               cutoff=CUTOFF_DEADLINE, elapsed=0.0, ids=None,
+                               last_transition=None, state=tm.initial_state)
+
+    admit()
+    while queue:
+        if deadline is not None and time.perf_counter() - started >= deadline:
+            while queue:
+                yield finished(*queue.popleft(), CUTOFF_DEADLINE)
+            for i, s in waiting:
+                yield not_started(i, s)
+            return
+
+        i, run, elapsed = queue.popleft()
+        before = run.steps
+        t0 = time.perf_counter()
+        run.advance(min(quantum, max_steps - run.steps))
+        elapsed += time.perf_counter() - t0
+
+        if run.halted:
+            yield finished(i, run, elapsed, None)
+        elif run.steps >= max_steps:
+            yield finished(i, run, elapsed, CUTOFF_STEPS)
+        elif string_timeout is not None and elapsed >= string_timeout:
+            yield finished(i, run, elapsed, CUTOFF_TIME)
+        else:
+            queue.append((i, run, elapsed))
+        admit()
+
+        if on_slice is not None and not on_slice(run.steps - before):
+            # Lo avanzado por las cadenas en curso queda en la caché para la próxima vez
+            if run_cache is not None:
+                for _, pending, _ in queue:
+                    run_cache.store(pending)
+            return
+
+
+def replay_ids(tm: TuringMachine, result: ScheduledResult, sparse: bool = False) -> List[InstantaneousDescription]:
+    """IDs de una cadena ya planificada, reconstruidas hasta los pasos de su resultado."""
+    run = MachineRun(tm, result.input_string, sparse=sparse)
+    run.run_until(result.steps)
+    return run.ids
+
+
+# ============================================================================
+# TRABAJOS DE SIMULACIÓN EN SEGUNDO PLANO
+# ============================================================================
+
+JOB_RUNNING = "ejecutando"
+JOB_DONE = "completado"
+JOB_CANCELLED = "cancelado"
+JOB_FAILED = "error"
+
+# Cadenas por página en el panel de resultados de la interfaz
+RESULTS_PAGE_SIZE = 20
+
+
+class SimulationJob:
+    """Simula un lote de cadenas en un hilo aparte, con progreso y cancelación.
+
+    Las cadenas se intercalan con round_robin, así que una cadena que no se
+    detiene no retrasa a las demás. La bandera de cancelación se revisa entre
+    tramos, así que cancelar detiene el trabajo de verdad. Los resultados
+    (ScheduledResult) se agregan a `results` conforme terminan y quedan
+    indexados por posición en `by_index`; los totales se llevan al vuelo para
+    que consultarlos no recorra el lote. No se registran IDs: se reconstruyen
+    por cadena cuando hacen falta (ver replay_ids), así que el costo del lote
+    no depende de mostrarlas.
+    """
+
+    def __init__(self, tm: TuringMachine, strings: List[str], max_steps: int,
+                 key: Any = None, quantum: int = 1000,
+                 string_timeout: Optional[float] = None,
+                 deadline: Optional[float] = None,
+                 sparse: bool = False,
+                 run_cache: Optional[RunCache] = None,
+                 max_active: int = 256):
+        self.tm = tm
+        self.strings = list(strings)
+        self.max_steps = max_steps
+        self.key = key
+        self.quantum = quantum
+        self.string_timeout = string_timeout
+        self.deadline = deadline
+        self.sparse = sparse
+        self.run_cache = run_cache
+        self.max_active = max_active
+        self.results: List[ScheduledResult] = []
+        self.by_index: Dict[int, ScheduledResult] = {}
+        self.steps_done = 0
+        self.accepted_count = 0
+        self.resumed_count = 0
+        self.resumed_steps = 0
+        self.status = JOB_RUNNING
+        self.error: Optional[str] = None
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._work, daemon=True)
+
+    @property
+    def strings_done(self) -> int:
+        return len(self.results)
+
+    @property
+    def done(self) -> bool:
+        return self.status != JOB_RUNNING
+
+    def start(self) -> 'SimulationJob':
+        self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        self._thread.join(timeout)
+        return self.done
+
+    def _on_slice(self, steps: int) -> bool:
+        self.steps_done += steps
+        return not self._cancel.is_set()
+
+    def _work(self) -> None:
+        try:
+            for result in round_robin(self.tm, self.strings, self.max_steps,
+                                      quantum=self.quantum,
+                                      string_timeout=self.string_timeout,
+                                      deadline=self.deadline,
+                                      on_slice=self._on_slice,
+                                      sparse=self.sparse,
+                                      run_cache=self.run_cache,
+                                      max_active=self.max_active):
+                self.by_index[result.index] = result
+                self.accepted_count += result.accepted
+                if result.resumed_from:
+                    self.resumed_count += 1
+                    self.resumed_steps += result.resumed_from
+                self.results.append(result)
+            self.status = JOB_CANCELLED if self._cancel.is_set() else JOB_DONE
+        except Exception as e:
+            self.error = str(e)
+            self.status = JOB_FAILED
+
+
+# ============================================================================
+# SERVIDOR LOCAL DE SIMULACIÓN (HTTP/JSON CON asyncio)
+# ============================================================================
+#
+#   GET  /health                      estado del servidor
+#   GET  /machines                    MT registradas
+#   POST /machines                    registra una MT: YAML crudo o JSON {"yaml", "strict_mode"}
+#   POST /machines/<id>/simulate      JSON {"strings", "max_steps", "timeout"}; responde
+#                                     una línea JSON por cadena (en el orden en que terminan)
+#                                     y una línea final con "done"
+#
+# Una MT con problemas de validate_machine se rechaza con 400 y la lista "issues".
+# Al vencer el tiempo límite cada cadena en curso se corta entre tramos y se
+# informa con "cutoff"; los procesos del pool quedan libres para otras peticiones.
+#
+# El id de una MT es su huella (TuringMachine.fingerprint). Los procesos del
+# pool construyen y compilan cada MT una sola vez (ver _WORKER_MACHINES).
+
+_SERVER_MAX_BODY = 64 << 20
+# Pasos entre revisiones del reloj en los procesos del pool
+_SERVER_QUANTUM = 1 << 16
+# Margen para que los tramos en curso entreguen sus resultados cortados
+_SERVER_GRACE = 5.0
+_HTTP_REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+                 405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+# MT ya construidas en cada proceso del pool, por huella
+_WORKER_MACHINES: Dict[str, TuringMachine] = {}
+
+
+class _HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class InvalidMachineError(ValueError):
+    """La definición no pasó validate_machine; `issues` lista los problemas."""
+
+    def __init__(self, issues: List[str]):
+        super().__init__(f"La MT tiene {len(issues)} problema(s) de validación")
+        self.issues = issues
+
+
+def _server_warmup() -> int:
+    return os.getpid()
+
+
+def _served_result(index: int, s: str, accepted: bool, steps: int,
+                   cutoff: Optional[str]) -> Dict[str, Any]:
+    return {"index": index, "input": s, "accepted": accepted, "steps": steps,
+            "halted": cutoff is None, "cutoff": cutoff}
+
+
+def _serve_task(args: Tuple[str, str, bool, List[Tuple[int, str]], int, float]) -> List[Dict[str, Any]]:
+    machine_id, yaml_content, strict_mode, strings, max_steps, deadline = args
+    tm = _WORKER_MACHINES.get(machine_id)
+    if tm is None:
+        tm, _, _ = build_turing_machine_from_yaml(yaml_content, strict_mode=strict_mode)
+        _WORKER_MACHINES[machine_id] = tm
+    # `deadline` es absoluto (time.time(), común a todos los procesos): las cadenas
+    # avanzan por tramos y las que siguen en curso al vencer salen cortadas
+    indexes = [index for index, _ in strings]
+    return [_served_result(indexes[r.index], r.input_string, r.accepted, r.steps, r.cutoff)
+            for r in round_robin(tm, [s for _, s in strings], max_steps, quantum=_SERVER_QUANTUM,
+                                 deadline=max(0.0, deadline - time.time()))]
+
+
+class SimulationServer:
+    """Servidor HTTP/JSON mínimo (solo biblioteca estándar) con un pool de procesos compartido.
+
+    `timeout` es el límite por petición en segundos (la petición puede pedir
+    uno menor). Al vencer, los tramos que aún no empezaron se cancelan y los
+    que ya corren se cortan entre pasos; en ambos casos sus cadenas se
+    informan con "cutoff" en vez de abandonarse.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765,
+                 workers: Optional[int] = None, timeout: float = 60.0, chunk_size: int = 256):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        # huella → (MT, YAML, strict_mode, cadenas de simulación del YAML)
+        self.machines: Dict[str, Tuple[TuringMachine, str, bool, List[str]]] = {}
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> 'SimulationServer':
+        """Levanta el pool (ya con sus procesos creados) y empieza a aceptar conexiones."""
+        loop = asyncio.get_running_loop()
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _server_warmup)
+                               for _ in range(self.workers)))
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self.pool is not None:
+            # Los tramos en curso se cortan en su plazo, así que esperarlos (fuera del
+            # bucle de eventos) está acotado por `timeout`
+            await asyncio.get_running_loop().run_in_executor(
+                None, lambda: self.pool.shutdown(wait=True, cancel_futures=True))
+
+    def serve_forever(self) -> None:
+        async def run() -> None:
+            await self.start()
+            print(f"Servidor de simulación en http://{self.host}:{self.port} "
+                  f"({self.workers} procesos)", flush=True)
+            try:
+                # SIGTERM cierra igual que Ctrl+C (no disponible en Windows)
+                asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, self._server.close)
+            except NotImplementedError:
+                pass
+            try:
+                await self._server.serve_forever()
+            except asyncio.CancelledError:
+                pass
+            finally:
+                await self.close()
+        try:
+            asyncio.run(run())
+        except KeyboardInterrupt:
+            pass
+
+    def register(self, yaml_content: str, strict_mode: bool = False) -> str:
+        """Construye, valida (como la interfaz) y compila la MT; devuelve su id (huella).
+
+        Registrar dos veces es inocuo. Si la definición tiene problemas lanza
+        InvalidMachineError con la lista; si el YAML no tiene la estructura de
+        una MT, ValueError (los dos se responden con 400).
+        """
+        try:
+            tm, strings, dup_msgs = build_turing_machine_from_yaml(yaml_content, strict_mode=strict_mode)
+        except (AttributeError, TypeError, KeyError, IndexError) as e:
+            raise ValueError(f"Error al procesar el YAML: {e}") from e
+        issues = validate_machine(tm.states, tm.initial_state, tm.final_state, tm.input_alphabet,
+                                  tm.tape_alphabet, tm.transitions, strings) + dup_msgs
+        if issues:
+            raise InvalidMachineError(list(dict.fromkeys(issues)))
+        machine_id = tm.fingerprint()
+        if machine_id not in self.machines:
+            compile_machine(tm)
+            self.machines[machine_id] = (tm, yaml_content, strict_mode, strings)
+        return machine_id
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                return
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+            headers: Dict[str, str] = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get("content-length", 0))
+            if length > _SERVER_MAX_BODY:
+                raise _HTTPError(413, "Cuerpo demasiado grande")
+            body = await reader.readexactly(length) if length else b""
+            await self._route(method, target.split("?", 1)[0].rstrip("/"), headers, body, writer)
+        except _HTTPError as e:
+            await self._send_json(writer, e.status, {"error": e.message})
+        except InvalidMachineError as e:
+            await self._send_json(writer, 400, {"error": str(e), "issues": e.issues})
+        except (ValueError, KeyError, TypeError) as e:
+            await self._send_json(writer, 400, {"error": str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            await self._send_json(writer, 500, {"error": str(e)})
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _route(self, method: str, path: str, headers: Dict[str, str], body: bytes,
+                     writer: asyncio.StreamWriter) -> None:
+        parts = [p for p in path.split("/") if p]
+        if parts == ["health"] and method == "GET":
+            await self._send_json(writer, 200, {"ok": True, "machines": len(self.machines),
+                                                "workers": self.workers})
+        elif parts == ["machines"] and method == "GET":
+            await self._send_json(writer, 200, {"machines": [
+                {"id": machine_id, "states": len(tm.states), "initial": tm.initial_state,
+                 "final": tm.final_state, "transitions": len(tm.transitions)}
+                for machine_id, (tm, _, _, _) in self.machines.items()]})
+        elif parts == ["machines"] and method == "POST":
+            if headers.get("content-type", "").startswith("application/json"):
+                request = self._json_object(body)
+                yaml_content, strict_mode = request["yaml"], bool(request.get("strict_mode", False))
+                if not isinstance(yaml_content, str):
+                    raise ValueError("'yaml' debe ser una cadena")
+            else:
+                yaml_content, strict_mode = body.decode("utf-8"), False
+            machine_id = self.register(yaml_content, strict_mode)
+            await self._send_json(writer, 201, {"id": machine_id,
+                                                "simulation_strings": self.machines[machine_id][3]})
+        elif len(parts) == 3 and parts[0] == "machines" and parts[2] == "simulate":
+            if method != "POST":
+                raise _HTTPError(405, "Usa POST para simular")
+            if parts[1] not in self.machines:
+                raise _HTTPError(404, f"MT no registrada: {parts[1]}")
+            await self._simulate(parts[1], self._json_object(body) if body else {}, writer)
+        elif parts and parts[0] in ("health", "machines"):
+            raise _HTTPError(405, f"Método {method} no permitido en /{'/'.join(parts)}")
+        else:
+            raise _HTTPError(404, f"Ruta desconocida: /{'/'.join(parts)}")
+
+    async def _simulate(self, machine_id: str, request: Dict[str, Any],
+                        writer: asyncio.StreamWriter) -> None:
+        tm, yaml_content, strict_mode, default_strings = self.machines[machine_id]
+        strings = request.get("strings", default_strings)
+        if not isinstance(strings, list) or not all(isinstance(s, str) for s in strings):
+            raise ValueError("'strings' debe ser una lista de cadenas")
+        max_steps = int(request.get("max_steps", 10000))
+        if max_steps < 0:
+            raise ValueError("'max_steps' no puede ser negativo")
+        timeout = min(float(request.get("timeout", self.timeout)), self.timeout)
+        for s in strings:
+            bad = invalid_symbols(tm.input_alphabet, s)
+            if bad:
+                raise ValueError(f"Cadena '{s}' contiene símbolos fuera de alphabet: {sorted(bad)}")
+
+        loop = asyncio.get_running_loop()
+        indexed = list(enumerate(strings))
+        deadline = time.time() + timeout
+        chunks = [indexed[i:i + self.chunk_size] for i in range(0, len(indexed), self.chunk_size)]
+        submitted = [self.pool.submit(_serve_task, (machine_id, yaml_content, strict_mode,
+                                                    chunk, max_steps, deadline))
+                     for chunk in chunks]
+        pending = {asyncio.wrap_future(f): chunk for f, chunk in zip(submitted, chunks)}
+        # Al vencer, los tramos que no empezaron se cancelan; los que corren se cortan solos
+        expire = loop.call_later(timeout, lambda: [f.cancel() for f in submitted])
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+                     b"Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n")
+        started = time.perf_counter()
+        count = accepted = cut = 0
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, timeout=max(0.0, deadline - time.time()) + _SERVER_GRACE,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise asyncio.TimeoutError
+                for future in done:
+                    chunk = pending.pop(future)
+                    if future.cancelled():
+                        results = [_served_result(i, s, False, 0, CUTOFF_DEADLINE) for i, s in chunk]
+                    else:
+                        results = future.result()
+                    count += len(results)
+                    accepted += sum(r["accepted"] for r in results)
+                    cut += sum(r["cutoff"] == CUTOFF_DEADLINE for r in results)
+                    await self._send_chunk(writer, "".join(json.dumps(r, ensure_ascii=False) + "\n"
+                                                           for r in results))
+            summary = {"done": not cut, "count": count, "accepted": accepted}
+            if cut:
+                summary["error"] = f"Tiempo límite de {timeout} s agotado: {cut} cadena(s) cortadas"
+        except asyncio.TimeoutError:
+            summary = {"done": False, "error": f"Tiempo límite de {timeout} s agotado", "count": count,
+                       "accepted": accepted}
+        except ConnectionError:
+            raise
+        except Exception as e:
+            # Las cabeceras ya se enviaron: el error va en la línea final
+            summary = {"done": False, "error": str(e), "count": count, "accepted": accepted}
+        finally:
+            expire.cancel()
+            for f in submitted:
+                f.cancel()
+        summary["elapsed"] = round(time.perf_counter() - started, 6)
+        await self._send_chunk(writer, json.dumps(summary, ensure_ascii=False) + "\n")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    @staticmethod
+    def _json_object(body: bytes) -> Dict[str, Any]:
+        request = json.loads(body)
+        if not isinstance(request, dict):
+            raise ValueError("El cuerpo JSON debe ser un objeto")
+        return request
+
+    @staticmethod
+    async def _send_chunk(writer: asyncio.StreamWriter, text: str) -> None:
+        data = text.encode("utf-8")
+        writer.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        await writer.drain()
+
+    @staticmethod
+    async def _send_json(writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        writer.write(f"HTTP/1.1 {status} {_HTTP_REASONS.get(status, '')}\r\n"
+                     f"Content-Type: application/json; charset=utf-8\r\n"
+                     f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode("latin-1") + data)
+        await writer.drain()
+
+
 # ============================================================================
 # FUNCIONES AUXILIARES
 # ============================================================================
@@ -675,6 +4173,203 @@ def create_statistics_chart(results: List[Tuple[str, bool, int]]) -> None:
                 st.error("❌ Rechazada")
 
 
+def render_statistics(results: List[Tuple[str, bool, int]]) -> None:
+    create_statistics_chart(results)
+    
+    st.markdown("### 🔍 Análisis Detallado")
+    
+    accepted_count = sum(1 for _, acc, _ in results if acc)
+    rejected_count = sum(1 for _, acc, _ in results if not acc)
+    
+    avg_steps_accepted = sum(steps for _, acc, steps in results if acc) / max(accepted_count, 1)
+    avg_steps_rejected = sum(steps for _, acc, steps in results if not acc) / max(rejected_count, 1)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.metric("⏱️ Promedio pasos (aceptadas)", f"{avg_steps_accepted:.1f}")
+        
+    with col2:
+        st.metric("⏱️ Promedio pasos (rechazadas)", f"{avg_steps_rejected:.1f}")
+    
+    st.markdown("### 📊 Tabla Resumen")
+    st.dataframe({
+        "Cadena": [s for s, _, _ in results],
+        "Estado": ["✅ Aceptada" if a else "❌ Rechazada" for _, a, _ in results],
+        "Pasos": [steps for _, _, steps in results]
+    }, use_container_width=True)
+
+
+def _render_ids(ids: List[InstantaneousDescription]) -> None:
+    for id_desc in ids:
+        if id_desc.step == 0:
+            st.markdown("**🟢 Configuración Inicial:**")
+        elif id_desc.step == len(ids) - 1:
+            st.markdown(f"**🔴 Configuración Final (Paso {id_desc.step}):**")
+        else:
+            st.markdown(f"**Paso {id_desc.step}:**")
+        
+        st.markdown(id_desc.to_html(), unsafe_allow_html=True)
+        
+        if id_desc.step < len(ids) - 1:
+            st.markdown("⬇️")
+
+
+def render_simulation_result(idx: int, input_string: str, accepted: bool,
+                             steps: int, state: str,
+                             last_transition: Optional[Transition],
+                             max_steps: int, show_all_ids: bool,
+                             cutoff: Optional[str] = None,
+                             diagram: Optional[np.ndarray] = None,
+                             symbols: Sequence[Optional[str]] = (),
+                             load_ids: Optional[Callable[[], List[InstantaneousDescription]]] = None) -> None:
+    st.markdown(f"### Simulación {idx}: `{input_string}`")
+    
+    result_class = "accepted" if accepted else "rejected"
+    result_icon = "✅" if accepted else "❌"
+    result_text = "ACEPTADA" if accepted else "RECHAZADA"
+    
+    st.markdown(f"""
+    <div class="simulation-result {result_class}">
+        <h4>{result_icon} {result_text}</h4>
+        <p><strong>Cadena:</strong> <code>{input_string}</code></p>
+        <p><strong>Pasos ejecutados:</strong> {steps}</p>
+        <p><strong>Estado final:</strong> {state}</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    if last_transition:
+        st.info(f"**Última transición:** {last_transition}")
+
+    if cutoff == CUTOFF_TIME:
+        st.warning("⏱️ Cortada por tiempo máximo por cadena.")
+    elif cutoff == CUTOFF_DEADLINE:
+        st.warning("⌛ Cortada por el plazo global del lote.")
+    elif not accepted and steps >= max_steps:
+        st.warning("⏱️ Rechazada por límite de pasos.")
+    elif not accepted:
+        st.warning("🚫 Rechazada: no había transición aplicable.")
+
+    if diagram is not None:
+        st.image(diagram, caption="Diagrama espacio-tiempo: una fila por paso (hacia abajo), "
+                                  "una columna por celda; cabezal en rojo")
+        st.markdown(" ".join(
+            f'<span style="background:{diagram_color(i)};border:1px solid #999;padding:0 6px"></span> '
+            f'<code>{_B(sym)}</code>' for i, sym in enumerate(symbols)), unsafe_allow_html=True)
+    
+    # Las IDs se reconstruyen solo si se piden (todas, o las de esta cadena)
+    if load_ids is not None:
+        if show_all_ids:
+            st.markdown("#### 📝 Descripciones Instantáneas Completas")
+            _render_ids(load_ids())
+        elif st.toggle(f"Ver {steps + 1} descripciones instantáneas", key=f"ids_{idx}_{input_string}"):
+            _render_ids(load_ids())
+
+    st.markdown("---")
+
+
+def render_nondeterministic_result(idx: int, input_string: str, nd: NondeterministicResult,
+                                   show_all_ids: bool) -> None:
+    st.markdown(f"### Simulación {idx}: `{input_string}`")
+
+    result_class = "accepted" if nd.accepted else "rejected"
+    result_icon = "✅" if nd.accepted else "❌"
+    result_text = "ACEPTADA" if nd.accepted else "RECHAZADA"
+
+    st.markdown(f"""
+    <div class="simulation-result {result_class}">
+        <h4>{result_icon} {result_text} (no determinista)</h4>
+        <p><strong>Cadena:</strong> <code>{input_string}</code></p>
+        <p><strong>Profundidad explorada:</strong> {nd.depth}</p>
+        <p><strong>Configuraciones visitadas:</strong> {nd.visited}</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    if nd.truncated:
+        st.warning("✂️ Alguna frontera superó el máximo y se recortó: un rechazo no es concluyente.")
+
+    st.markdown("#### 🌳 Tamaño de la frontera por profundidad")
+    st.bar_chart({"Frontera": nd.frontier_sizes})
+
+    if nd.accepted:
+        if show_all_ids:
+            st.markdown("#### 📝 Rama aceptante")
+            _render_ids(nd.path)
+        else:
+            with st.expander(f"Ver rama aceptante ({len(nd.path)} descripciones instantáneas)"):
+                _render_ids(nd.path)
+
+    st.markdown("---")
+
+
+def render_job_progress(job: 'SimulationJob', refreshing: bool) -> None:
+    total = len(job.strings)
+    if not job.done:
+        done, accepted = job.strings_done, job.accepted_count
+        st.progress(done / total,
+                    text=f"⏳ Simulando: {done}/{total} cadenas · ✅ {accepted} aceptadas · "
+                         f"❌ {done - accepted} rechazadas · {job.steps_done} pasos")
+        if st.button("⏹️ Cancelar simulación"):
+            job.cancel()
+    elif job.status == JOB_CANCELLED:
+        st.warning(f"⏹️ Simulación cancelada: {job.strings_done}/{total} cadenas, {job.steps_done} pasos.")
+        if st.button("🔁 Volver a simular"):
+            st.session_state.pop("job", None)
+            st.rerun()
+    elif job.status == JOB_FAILED:
+        st.error(f"❌ Error durante la simulación: {job.error}")
+
+    # Al terminar, una ejecución completa apaga el auto-refresco de los fragmentos
+    if refreshing and job.done:
+        st.rerun()
+
+
+def tape_window_html(left: int, cells: Sequence[Optional[str]], head: int,
+                     changed: Iterable[int] = ()) -> str:
+    """Ventana fija de la cinta (posiciones absolutas desde `left`), con el cabezal y
+    las celdas que cambiaron desde el cuadro anterior resaltados."""
+    base = (
+        "background:#000;color:#fff;padding:6px 10px;margin:2px;"
+        "border:1px solid #333;border-radius:4px;min-width:28px;"
+        "text-align:center;display:inline-block;font-family:monospace;"
+    )
+    changed = set(changed)
+    html = '<div style="display:flex;align-items:center;flex-wrap:nowrap;overflow-x:auto;">'
+    for position, symbol in enumerate(cells, left):
+        style = base
+        if position in changed:
+            style += "background:#5a3d00;"
+        if position == head:
+            style += "outline:3px solid #ffcc00;font-weight:bold;"
+        html += f'<span style="{style}" title="{position}">{symbol if symbol is not None else "B"}</span>'
+    return html + '</div>'
+
+
+def cancel_session_job() -> None:
+    """Cancela y olvida el trabajo de simulación de la sesión, si hay uno."""
+    job = st.session_state.pop("job", None)
+    if job is not None:
+        job.cancel()
+
+
+def memo_by_machine(kind: str, tm: TuringMachine, compute: Callable[[], Any]) -> Any:
+    """Resultado de ``compute`` memoizado en la sesión por (tipo, huella de la MT).
+
+    Las claves de sesión deben ser datos simples (tuplas, cadenas). Las clases
+    del script se redefinen en cada ejecución de Streamlit: las instancias
+    guardadas (SimulationJob, RunCache, RunPlayer…) sobreviven y se usan igual,
+    pero isinstance y la igualdad de dataclasses contra las clases nuevas ya no
+    las reconocen.
+    """
+    cache = st.session_state.setdefault("tab_cache", {})
+    key = (kind, tm.fingerprint())
+    if key not in cache:
+        if len(cache) >= 64:
+            cache.clear()
+        cache[key] = compute()
+    return cache[key]
+
+
 # ============================================================================
 # EJEMPLOS PREDEFINIDOS
 # ============================================================================
@@ -1679,6 +5374,18 @@ def main():
         show_all_ids = st.checkbox("Mostrar todas las IDs", value=False)
         show_graph = st.checkbox("Mostrar diagrama de estados", value=True)
         strict_mode = st.checkbox("δ estricta (sin comodines 'B')", value=False)
+        nondeterministic = st.checkbox("MT no determinista (BFS)", value=False)
+        minimize = st.checkbox("Minimizar MT antes de simular", value=False,
+                               help="Poda estados/transiciones inalcanzables y fusiona estados equivalentes")
+        max_frontier = 10000
+        if nondeterministic:
+            max_frontier = st.number_input("Frontera máxima por profundidad:", 10, 1_000_000, 10000, 100)
+        string_timeout = st.number_input("Tiempo máximo por cadena (s, 0 = sin límite):", 0.0, 3600.0, 0.0, 0.5)
+        batch_deadline = st.number_input("Plazo global del lote (s, 0 = sin límite):", 0.0, 36000.0, 0.0, 1.0)
+        sparse_tape = st.checkbox("Cinta dispersa (por páginas)", value=False,
+                                  help="Solo guarda las páginas con símbolos no blancos; útil si la MT escribe marcas muy separadas")
+        show_spacetime = st.checkbox("Diagrama espacio-tiempo", value=False,
+                                     help="Imagen de toda la ejecución (una fila por paso) por cada cadena")
         
         st.markdown("---")
         custom_input = st.text_input("Cadena personalizada:", "")
@@ -1796,195 +5503,545 @@ simulation_strings:
         for i, name in enumerate(EXAMPLES.keys(), 1):
             st.write(f"{i}. **{name}**")
         
+        cancel_session_job()
         return
     
     try:
         with st.spinner("🔄 Procesando Máquina de Turing..."):
-            tm, simulation_strings, dup_msgs = build_turing_machine_from_yaml(yaml_content, strict_mode=strict_mode)
+            # DEBUG: Mostrar datos parseados
+            st.sidebar.markdown("**DEBUG - Datos parseados:**")
+            st.sidebar.json(YAMLParser().parse(yaml_content), expanded=False)
+
+            tm, simulation_strings, dup_msgs = build_turing_machine_from_yaml(
+                yaml_content, strict_mode=strict_mode, nondeterministic=nondeterministic)
             issues = validate_machine(
             tm.states, tm.initial_state, tm.final_state,
-            tm.input_alphabet, tm.tape_alphabet, tm.transitions, simulation_strings
+            tm.input_alphabet, tm.tape_alphabet, tm.transitions, simulation_strings,
+            nondeterministic=nondeterministic
             )
             issues.extend(dup_msgs)
             if issues:
                 with st.expander("⚠️ Problemas detectados en la definición (haz click para ver)"):
                     for msg in issues:
                         st.warning(msg)
+                cancel_session_job()
                 st.stop()  # <- NO seguimos a simular si hay problemas
             else:
                 st.success("✅ Validación básica: sin problemas detectados")
+
+        # Pasada de optimización previa a la simulación
+        original_tm, state_mapping = tm, None
+        if minimize and not nondeterministic:
+            tm, state_mapping = minimize_machine(tm)
         
-        results = st.session_state.setdefault("results", [])
-        
-        tab1, tab2, tab3, tab4 = st.tabs(["📋 Información", "📊 Diagrama", "🎯 Simulación", "📈 Estadísticas"])
+        strings_to_simulate = simulation_strings.copy()
+        if custom_input and custom_input.strip():
+            strings_to_simulate.append(custom_input.strip())
+        bad_custom = invalid_symbols(tm.input_alphabet, custom_input.strip()) if custom_input else set()
+
+        # Un trabajo por (MT, cadenas, límite): si algo cambia se cancela el anterior ya,
+        # aunque la pestaña abierta no lo necesite
+        job_key = (yaml_content, strict_mode, minimize, tuple(strings_to_simulate), max_steps,
+                   string_timeout, batch_deadline, sparse_tape)
+        stale = st.session_state.get("job")
+        if stale is not None and (nondeterministic or stale.key != job_key):
+            cancel_session_job()
+
+        def simulation_job() -> 'SimulationJob':
+            """Trabajo del lote actual; se crea solo cuando una pestaña lo necesita."""
+            job = st.session_state.get("job")
+            if job is None:
+                job = SimulationJob(tm, strings_to_simulate, max_steps, key=job_key,
+                                    string_timeout=string_timeout or None,
+                                    deadline=batch_deadline or None,
+                                    sparse=sparse_tape,
+                                    run_cache=st.session_state.setdefault("run_cache", RunCache())).start()
+                st.session_state["job"] = job
+            return job
+
+        def nondeterministic_results() -> List[Tuple[str, 'NondeterministicResult']]:
+            """Exploración BFS de cada cadena, memoizada por (MT, cadenas, límites)."""
+            nd_key = (tm.fingerprint(), tuple(strings_to_simulate), max_steps, int(max_frontier))
+            cached = st.session_state.get("nd_results")
+            if cached is None or cached[0] != nd_key:
+                explored = []
+                for idx, input_string in enumerate(strings_to_simulate, 1):
+                    with st.spinner(f"Explorando ramas de la cadena {idx}..."):
+                        explored.append((input_string, simulate_nondeterministic(
+                            tm, input_string, max_steps, int(max_frontier))))
+                cached = (nd_key, explored)
+                st.session_state["nd_results"] = cached
+            return cached[1]
+
+        # Pestañas perezosas: solo se ejecuta la abierta y lo costoso se memoiza por huella de la MT
+        tab1, tab2, tab3, tab4 = st.tabs(["📋 Información", "📊 Diagrama", "🎯 Simulación", "📈 Estadísticas"],
+                                         key="active_tab", on_change="rerun")
         
         with tab1:
-            st.header("📋 Información de la Máquina de Turing")
+            if tab1.open:
+                st.header("📋 Información de la Máquina de Turing")
             
-            col1, col2, col3 = st.columns(3)
+                col1, col2, col3 = st.columns(3)
             
-            with col1:
-                st.markdown("### Estados")
-                st.write(f"**Total:** {len(tm.states)}")
-                st.write(f"**Inicial:** `{tm.initial_state}`")
-                st.write(f"**Final:** `{tm.final_state}`")
-                st.write(f"**Lista:** {', '.join(f'`{s}`' for s in tm.states)}")
+                with col1:
+                    st.markdown("### Estados")
+                    st.write(f"**Total:** {len(tm.states)}")
+                    st.write(f"**Inicial:** `{tm.initial_state}`")
+                    st.write(f"**Final:** `{tm.final_state}`")
+                    st.write(f"**Lista:** {', '.join(f'`{s}`' for s in tm.states)}")
             
-            with col2:
-                st.markdown("### Alfabetos")
-                st.write(f"**Entrada:** {', '.join(f'`{_B(s)}`' for s in tm.input_alphabet)}")
-                st.write(f"**Cinta:** {', '.join(f'`{_B(s)}`' for s in tm.tape_alphabet)}")
+                with col2:
+                    st.markdown("### Alfabetos")
+                    st.write(f"**Entrada:** {', '.join(f'`{_B(s)}`' for s in tm.input_alphabet)}")
+                    st.write(f"**Cinta:** {', '.join(f'`{_B(s)}`' for s in tm.tape_alphabet)}")
             
-            with col3:
-                st.markdown("### Transiciones")
-                st.write(f"**Total:** {len(tm.transitions)}")
-                st.write(f"**Cadenas de prueba:** {len(simulation_strings)}")
+                with col3:
+                    st.markdown("### Transiciones")
+                    st.write(f"**Total:** {len(tm.transitions)}")
+                    st.write(f"**Cadenas de prueba:** {len(simulation_strings)}")
             
-            st.markdown("---")
-            st.subheader("📝 Tabla de Transiciones")
-            st.dataframe(export_transitions_table(tm), use_container_width=True)
-            st.caption(
-                "Resolución de δ: " +
-                ("estricta (B solo cuando la celda es realmente blanca)"
-                if strict_mode else
-                "prioridad exacta → (mem,B) → (B,cinta) → (B,B). B = blanco/comodín.")
-            )
+                st.markdown("---")
+                st.subheader("📝 Tabla de Transiciones")
+                st.dataframe(memo_by_machine("transitions", tm, lambda: export_transitions_table(tm)),
+                             use_container_width=True)
+                st.caption(
+                    "Resolución de δ: " +
+                    ("estricta (B solo cuando la celda es realmente blanca)"
+                    if strict_mode else
+                    "prioridad exacta → (mem,B) → (B,cinta) → (B,B). B = blanco/comodín.")
+                )
+
+                for loop in memo_by_machine("loops", tm, lambda: find_stationary_loops(tm)):
+                    cycle = " → ".join(f"[{q}, {_B(c)}]({_B(s)})" for q, c, s in loop)
+                    st.warning(f"⚠️ Bucle infinito garantizado (solo movimientos S): {cycle}")
+
+                if state_mapping is not None:
+                    st.markdown("---")
+                    st.subheader("🧹 Minimización")
+                    st.write(
+                        f"**Estados:** {len(original_tm.states)} → {len(tm.states)} · "
+                        f"**Transiciones:** {len(original_tm.transitions)} → {len(tm.transitions)}"
+                    )
+                    st.dataframe({
+                        "Estado": list(state_mapping.keys()),
+                        "Estados originales": [", ".join(v) for v in state_mapping.values()],
+                    }, use_container_width=True)
+
+                with st.expander("⚖️ Comparar con otra MT (equivalencia acotada)"):
+                    if nondeterministic:
+                        st.info("La comparación solo está disponible para MT deterministas.")
+                    else:
+                        other_choice = st.selectbox("Otra MT:", ["Pegar YAML"] + list(EXAMPLES.keys()))
+                        other_yaml = (st.text_area("YAML de la otra MT:", height=200)
+                                      if other_choice == "Pegar YAML" else EXAMPLES[other_choice])
+                        col1, col2, col3 = st.columns(3)
+                        with col1:
+                            eq_length = st.number_input("Longitud máxima (n):", 0, 20, 6, key="eq_length")
+                        with col2:
+                            eq_sample = st.number_input("Muestra aleatoria (0 = todas):", 0, 1_000_000, 0, 100)
+                        with col3:
+                            eq_tapes = st.checkbox("Comparar cinta final", value=False)
+                        if st.button("Comparar") and other_yaml:
+                            other_tm, _, _ = build_turing_machine_from_yaml(other_yaml, strict_mode=strict_mode)
+                            with st.spinner("Comparando..."):
+                                eq = check_equivalence(tm, other_tm, int(eq_length), max_steps,
+                                                       sample=int(eq_sample) or None,
+                                                       compare_tapes=eq_tapes)
+                            if eq.equivalent:
+                                st.success(f"✅ Sin diferencias en {eq.checked} cadenas")
+                            else:
+                                c = eq.counterexample
+                                st.error(
+                                    f"❌ Difieren en `{c.input_string or 'ε'}` ({c.reason}) "
+                                    f"tras revisar {eq.checked} cadenas"
+                                )
+                                for col, title, acc, steps, ids in zip(
+                                        st.columns(2), ("Esta MT", "Otra MT"), c.accepted, c.steps, c.ids):
+                                    with col:
+                                        st.markdown(f"**{title}:** {'✅ ACEPTADA' if acc else '❌ RECHAZADA'} "
+                                                    f"en {steps} pasos")
+                                        _render_ids(ids)
+
+                with st.expander("🔗 Encadenar con otra MT (pipeline)"):
+                    if nondeterministic:
+                        st.info("El pipeline solo está disponible para MT deterministas.")
+                    else:
+                        st.caption("La siguiente MT arranca sobre la cinta y el cabezal finales de esta, "
+                                   "si esta aceptó. Los pasos son por etapa.")
+                        next_choice = st.selectbox("Siguiente MT:", ["Pegar YAML"] + list(EXAMPLES.keys()),
+                                                   key="pipe_choice")
+                        next_yaml = (st.text_area("YAML de la siguiente MT:", height=200, key="pipe_yaml")
+                                     if next_choice == "Pegar YAML" else EXAMPLES[next_choice])
+                        if st.button("Encadenar") and next_yaml:
+                            next_tm, _, _ = build_turing_machine_from_yaml(next_yaml, strict_mode=strict_mode)
+                            with st.spinner("Corriendo pipeline..."):
+                                piped = MachinePipeline([tm, next_tm]).run_batch(simulation_strings, max_steps)
+                            st.dataframe(pd.DataFrame([{
+                                "Cadena": r.input_string or "ε",
+                                **{f"Etapa {s.stage + 1}": f"{'✅' if s.accepted else '❌'} {s.steps} pasos"
+                                   for s in r.stages},
+                                "Resultado": "✅ ACEPTADA" if r.accepted else "❌ RECHAZADA",
+                            } for r in piped]), hide_index=True)
         
         with tab2:
-            st.header("📊 Diagrama de Estados")
+            if tab2.open:
+                st.header("📊 Diagrama de Estados")
             
-            if show_graph:
-                try:
-                    dot = tm.to_graphviz()
-                    st.graphviz_chart(dot, use_container_width=True)
+                if show_graph:
+                    try:
+                        dot = memo_by_machine("graphviz", tm, lambda: tm.to_graphviz().source)
+                        st.graphviz_chart(dot, use_container_width=True)
                     
-                    st.markdown("""
-                    <div class="info-box">
-                        <strong>Leyenda:</strong>
-                        <ul>
-                            <li>🟢 Estado inicial (amarillo claro)</li>
-                            <li>🎯 Estado final (verde claro, doble círculo)</li>
-                            <li>🔵 Estados intermedios (azul claro)</li>
-                            <li>➡️ Transiciones con formato: [cache],entrada → [cache],salida,dirección</li>
-                        </ul>
-                    </div>
-                    """, unsafe_allow_html=True)
-                except Exception as e:
-                    st.error(f"❌ Error al generar diagrama: {str(e)}")
-            else:
-                st.info("Activa 'Mostrar diagrama de estados' en la barra lateral")
+                        st.markdown("""
+                        <div class="info-box">
+                            <strong>Leyenda:</strong>
+                            <ul>
+                                <li>🟢 Estado inicial (amarillo claro)</li>
+                                <li>🎯 Estado final (verde claro, doble círculo)</li>
+                                <li>🔵 Estados intermedios (azul claro)</li>
+                                <li>➡️ Transiciones con formato: [cache],entrada → [cache],salida,dirección</li>
+                            </ul>
+                        </div>
+                        """, unsafe_allow_html=True)
+                    except Exception as e:
+                        st.error(f"❌ Error al generar diagrama: {str(e)}")
+                else:
+                    st.info("Activa 'Mostrar diagrama de estados' en la barra lateral")
         
         with tab3:
-            st.header("🎯 Simulaciones")
-            
-            strings_to_simulate = simulation_strings.copy()
-            if custom_input and custom_input.strip():
-                strings_to_simulate.append(custom_input.strip())
-            
-            if not strings_to_simulate:
-                st.warning("⚠️ No hay cadenas para simular. Agrega cadenas en 'simulation_strings' o usa la entrada personalizada.")
-                return
-            
-            results.clear()
+            if tab3.open:
+                st.header("🎯 Simulaciones")
 
-            # justo después de construir strings_to_simulate:
-            if custom_input and custom_input.strip():
-                bad = [c for c in custom_input if c not in set(tm.input_alphabet)]
-                if bad:
-                    st.warning(f"Cadena personalizada contiene símbolos fuera de 'alphabet': {set(bad)}")
+                if not strings_to_simulate:
+                    st.warning("⚠️ No hay cadenas para simular. Agrega cadenas en 'simulation_strings' o usa la entrada personalizada.")
+                    return
+
+                if bad_custom:
+                    st.warning(f"Cadena personalizada contiene símbolos fuera de 'alphabet': {bad_custom}")
                     st.stop()
-            
-            for idx, input_string in enumerate(strings_to_simulate, 1):
-                st.markdown(f"### Simulación {idx}: `{input_string}`")
-                
-                with st.spinner(f"Simulando cadena {idx}..."):
-                    accepted, ids, last_transition = tm.simulate(input_string, max_steps)
-                
-                result_class = "accepted" if accepted else "rejected"
-                result_icon = "✅" if accepted else "❌"
-                result_text = "ACEPTADA" if accepted else "RECHAZADA"
-                
-                st.markdown(f"""
-                <div class="simulation-result {result_class}">
-                    <h4>{result_icon} {result_text}</h4>
-                    <p><strong>Cadena:</strong> <code>{input_string}</code></p>
-                    <p><strong>Pasos ejecutados:</strong> {len(ids)-1}</p>
-                    <p><strong>Estado final:</strong> {ids[-1].state}</p>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                if last_transition:
-                    st.info(f"**Última transición:** {last_transition}")
-                
-                if show_all_ids:
-                    st.markdown("#### 📝 Descripciones Instantáneas Completas")
-                    for id_desc in ids:
-                        if id_desc.step == 0:
-                            st.markdown("**🟢 Configuración Inicial:**")
-                        elif id_desc.step == len(ids) - 1:
-                            st.markdown(f"**🔴 Configuración Final (Paso {id_desc.step}):**")
-                        else:
-                            st.markdown(f"**Paso {id_desc.step}:**")
-                        
-                        st.markdown(id_desc.to_html(), unsafe_allow_html=True)
-                        
-                        if id_desc.step < len(ids) - 1:
-                            st.markdown("⬇️")
+
+                if nondeterministic:
+                    for idx, (input_string, nd) in enumerate(nondeterministic_results(), 1):
+                        render_nondeterministic_result(idx, input_string, nd, show_all_ids)
                 else:
-                    with st.expander(f"Ver {len(ids)} descripciones instantáneas"):
-                        for id_desc in ids:
-                            if id_desc.step == 0:
-                                st.markdown("**🟢 Configuración Inicial:**")
-                            elif id_desc.step == len(ids) - 1:
-                                st.markdown(f"**🔴 Configuración Final (Paso {id_desc.step}):**")
+                    job = simulation_job()
+
+                    # Mientras el trabajo corre, los fragmentos se refrescan solos
+                    refresh = None if job.done else 0.5
+
+                    @st.fragment(run_every=refresh)
+                    def simulation_panel():
+                        render_job_progress(job, refreshing=refresh is not None)
+                        if job.resumed_count:
+                            st.caption(f"♻️ {job.resumed_count} cadena(s) continuadas desde una ejecución "
+                                       f"anterior ({job.resumed_steps} pasos reutilizados)")
+                        diagrams = st.session_state.setdefault("spacetime", {})
+                        replayed = st.session_state.setdefault("replayed_ids", {})
+
+                        def ids_loader(r: ScheduledResult) -> Callable[[], List[InstantaneousDescription]]:
+                            def load() -> List[InstantaneousDescription]:
+                                ids_key = (tm.fingerprint(), r.input_string, r.steps, sparse_tape)
+                                if ids_key not in replayed:
+                                    if len(replayed) >= 64:
+                                        replayed.clear()
+                                    replayed[ids_key] = replay_ids(tm, r, sparse_tape)
+                                return replayed[ids_key]
+                            return load
+
+                        # Solo se dibuja una página del lote: cada refresco cuesta lo mismo sin
+                        # importar cuántas cadenas haya; el progreso de arriba resume el resto
+                        total = len(job.strings)
+                        pages = max(1, -(-total // RESULTS_PAGE_SIZE))
+                        if st.session_state.get("sim_page", 1) > pages:
+                            st.session_state["sim_page"] = pages
+                        if pages > 1:
+                            page = int(st.number_input(f"Página de resultados (de {pages}):", 1, pages,
+                                                       key="sim_page"))
+                        else:
+                            page = 1
+                        first = (page - 1) * RESULTS_PAGE_SIZE
+                        last = min(first + RESULTS_PAGE_SIZE, total)
+                        if pages > 1:
+                            st.caption(f"Cadenas {first + 1}–{last} de {total}")
+
+                        # Un lugar por cadena en el orden del lote; se llena cuando llega su veredicto
+                        for i in range(first, last):
+                            r = job.by_index.get(i)
+                            if r is None:
+                                st.markdown(f"### Simulación {i + 1}: `{job.strings[i]}`")
+                                st.caption("⏳ En cola…" if not job.done else "⏹️ Sin resultado")
+                                continue
+                            diagram = None
+                            if show_spacetime:
+                                # Una imagen por (MT, cadena, límite); se reutiliza en cada refresco
+                                diagram_key = (tm.fingerprint(), r.input_string, max_steps)
+                                if diagram_key not in diagrams:
+                                    if len(diagrams) >= 256:
+                                        diagrams.clear()
+                                    diagrams[diagram_key] = run_space_time(tm, r.input_string, max_steps)
+                                diagram = diagrams[diagram_key]
+                            render_simulation_result(r.index + 1, r.input_string, r.accepted, r.steps,
+                                                     r.state, r.last_transition, max_steps, show_all_ids,
+                                                     cutoff=r.cutoff, diagram=diagram,
+                                                     symbols=tm.codec.symbols, load_ids=ids_loader(r))
+
+                    simulation_panel()
+
+                    with st.expander("🎬 Reproducción animada"):
+                        st.caption("Avanza la ejecución viva sin repetirla desde el paso 0 ni guardar la traza "
+                                   "(sin límite de pasos). Retroceder parte de la copia guardada más cercana.")
+                        col1, col2, col3 = st.columns(3)
+                        with col1:
+                            play_string = st.selectbox("Cadena:", strings_to_simulate,
+                                                       format_func=lambda s: s or "ε", key="play_string")
+                        with col2:
+                            per_frame = int(st.number_input("Pasos por cuadro:", 1, 10_000_000, 1,
+                                                            key="play_per_frame"))
+                        with col3:
+                            interval = st.number_input("Segundos por cuadro:", 0.1, 5.0, 0.5, 0.1,
+                                                       key="play_interval")
+
+                        # Un reproductor por (MT, cadena, modo de cinta); las claves son tuplas simples
+                        play_key = (yaml_content, strict_mode, minimize, play_string, sparse_tape)
+                        stored = st.session_state.get("player")
+                        if stored is None or stored[0] != play_key:
+                            stored = (play_key, RunPlayer(tm, play_string, sparse=sparse_tape))
+                            st.session_state["player"] = stored
+                            st.session_state["player_playing"] = False
+                            st.session_state.pop("player_frame", None)
+                        player = stored[1]
+                        playing = st.session_state.get("player_playing", False)
+
+                        # Solo este fragmento se vuelve a ejecutar en cada cuadro
+                        @st.fragment(run_every=interval if playing else None)
+                        def player_panel():
+                            col1, col2, col3, col4, col5 = st.columns(5)
+                            with col1:
+                                restart = st.button("⏮️ Inicio", key="play_restart")
+                            with col2:
+                                back = st.button("◀️ Atrás", key="play_back")
+                            with col3:
+                                toggle = st.button("⏸️ Pausa" if playing else "▶️ Reproducir", key="play_toggle")
+                            with col4:
+                                forward = st.button("▶️ Adelante", key="play_forward")
+                            with col5:
+                                target = st.number_input("Ir al paso:", 0, 10**12, 0, key="play_target",
+                                                         label_visibility="collapsed")
+                                seek = st.button("↪️ Ir al paso", key="play_seek")
+
+                            if toggle:
+                                # Cambiar el auto-refresco requiere una ejecución completa
+                                st.session_state["player_playing"] = not playing and not player.run.halted
+                                st.rerun()
+                            if restart:
+                                player.seek(0)
+                            elif back:
+                                player.back(per_frame)
+                            elif seek:
+                                player.seek(int(target))
+                            elif forward or playing:
+                                player.forward(per_frame)
+
+                            run = player.run
+                            left, cells = player.window(20)
+                            previous = st.session_state.get("player_frame")
+                            changed = ()
+                            if previous is not None:
+                                # Comparar por posición absoluta: la ventana sigue al cabezal
+                                before = dict(enumerate(previous[1], previous[0]))
+                                changed = [p for p, sym in enumerate(cells, left) if p in before and before[p] != sym]
+                            st.session_state["player_frame"] = (left, tuple(cells))
+                            st.markdown(tape_window_html(left, cells, player.head, changed), unsafe_allow_html=True)
+                            st.markdown(f"**Paso {run.steps}** · Estado: `{run.state}` · "
+                                        f"Cache: `{_B(run.mem_cache)}` · Posición: `{player.head}`")
+                            st.caption(f"Copias guardadas: {len(player.keyframes)} (cada {player.keyframe_every} pasos)")
+                            if run.accepted:
+                                st.success(f"✅ ACEPTADA en {run.reported_steps} pasos")
+                            elif run.halted:
+                                st.error(f"❌ RECHAZADA en {run.reported_steps} pasos: no había transición aplicable")
+                            if playing and run.halted:
+                                st.session_state["player_playing"] = False
+                                st.rerun()
+
+                        player_panel()
+
+                    with st.expander("🐞 Ejecutar hasta punto de parada"):
+                        dbg_string = st.selectbox("Cadena:", strings_to_simulate,
+                                                  format_func=lambda s: s or "ε", key="dbg_string")
+                        col1, col2, col3 = st.columns(3)
+                        with col1:
+                            dbg_state = st.selectbox("Estado:", ["(cualquiera)"] + tm.states, key="dbg_state")
+                            dbg_symbol = st.text_input("Símbolo bajo el cabezal (vacío = cualquiera):", key="dbg_symbol")
+                        with col2:
+                            dbg_cache = st.text_input("Cache (vacío = cualquiera):", key="dbg_cache")
+                            dbg_step = st.number_input("Paso (0 = cualquiera):", 0, 10_000_000, 0, key="dbg_step")
+                        with col3:
+                            use_range = st.checkbox("Cabezal en rango", key="dbg_use_range")
+                            dbg_range = (st.number_input("Desde:", -100_000, 100_000, 0, key="dbg_lo"),
+                                         st.number_input("Hasta:", -100_000, 100_000, 0, key="dbg_hi")) if use_range else None
+                            use_cell = st.checkbox("Vigilar escritura en celda", key="dbg_use_cell")
+                            dbg_cell = st.number_input("Celda:", -100_000, 100_000, 1, key="dbg_cell") if use_cell else None
+
+                        conditions = dict(
+                            state=None if dbg_state == "(cualquiera)" else dbg_state,
+                            symbol=dbg_symbol or None, cache=dbg_cache or None,
+                            head_range=None if dbg_range is None else (int(dbg_range[0]), int(dbg_range[1])),
+                            write_cell=None if dbg_cell is None else int(dbg_cell),
+                            step=int(dbg_step) or None,
+                        )
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            run_clicked = st.button("▶️ Ejecutar hasta punto de parada")
+                        with col2:
+                            continue_clicked = st.button("⏭️ Continuar")
+                        if run_clicked or continue_clicked:
+                            if all(v is None for v in conditions.values()):
+                                st.warning("Define al menos una condición.")
                             else:
-                                st.markdown(f"**Paso {id_desc.step}:**")
-                            
-                            st.markdown(id_desc.to_html(), unsafe_allow_html=True)
-                            
-                            if id_desc.step < len(ids) - 1:
-                                st.markdown("⬇️")
-
-                        if not accepted and len(ids)-1 >= max_steps:
-                            st.warning("⏱️ Rechazada por límite de pasos.")
-                        elif not accepted:
-                            st.warning("🚫 Rechazada: no había transición aplicable.")
-
-                results.append((input_string, accepted, len(ids)-1))
-                st.markdown("---")
+                                bp = Breakpoint(**conditions)
+                                # Condiciones como tupla: Streamlit redefine las clases en cada ejecución del script
+                                dbg_key = (yaml_content, strict_mode, minimize, dbg_string,
+                                           tuple(conditions.values()), max_steps)
+                                previous = st.session_state.get("debug")
+                                resume = (continue_clicked and previous is not None
+                                          and previous[0] == dbg_key and not previous[1].halted)
+                                hit = run_to_breakpoint(tm, dbg_string, [bp], max_steps,
+                                                        run=previous[1].run if resume else None)
+                                st.session_state["debug"] = (dbg_key, hit)
+
+                        debug = st.session_state.get("debug")
+                        if debug is not None and debug[0][:4] == (yaml_content, strict_mode, minimize, dbg_string):
+                            hit = debug[1]
+                            if hit.breakpoint is not None:
+                                st.success(f"⛔ Punto de parada en el paso {hit.steps}: {hit.breakpoint}")
+                            elif hit.halted:
+                                st.info(f"La MT se detuvo en el paso {hit.steps} "
+                                        f"({'ACEPTADA' if hit.accepted else 'RECHAZADA'}) sin alcanzar el punto de parada.")
+                            else:
+                                st.warning(f"Se alcanzó el máximo de pasos ({max_steps}) sin alcanzar el punto de parada.")
+                            for d in hit.window:
+                                marker = " ⛔" if d.step == hit.steps else ""
+                                st.markdown(f"**Paso {d.step}{marker}:**")
+                                st.markdown(d.to_html(), unsafe_allow_html=True)
+
+                    with st.expander("📂 Entrada grande desde archivo"):
+                        st.caption("Cada byte del archivo es un símbolo. Se valida y codifica en bloque "
+                                   "directo a la cinta, sin registrar IDs.")
+                        upload = st.file_uploader("Archivo de entrada:", key="large_input")
+                        if upload is not None and st.button("▶️ Simular archivo"):
+                            try:
+                                with st.spinner("Simulando archivo..."):
+                                    run = MachineRun(tm, upload.getbuffer(), record_ids=False, sparse=sparse_tape)
+                                    run.run_until(max_steps)
+                            except ValueError as e:
+                                st.error(f"❌ {e}")
+                            else:
+                                size = len(upload.getbuffer())
+                                if run.accepted:
+                                    st.success(f"✅ ACEPTADA en {run.reported_steps} pasos ({size} bytes de entrada)")
+                                elif run.halted:
+                                    st.error(f"❌ RECHAZADA en {run.reported_steps} pasos: no había transición aplicable")
+                                else:
+                                    st.warning(f"⏱️ Se alcanzó el máximo de pasos ({max_steps}) sin detenerse.")
+                                st.caption(f"Estado final: {run.state} · SHA-256: `{run.input_digest[:16]}…`")
         
         with tab4:
-            st.header("📈 Estadísticas de Simulación")
-            
-            if results:
-                create_statistics_chart(results)
-                
-                st.markdown("### 🔍 Análisis Detallado")
-                
-                accepted_count = sum(1 for _, acc, _ in results if acc)
-                rejected_count = sum(1 for _, acc, _ in results if not acc)
-                
-                avg_steps_accepted = sum(steps for _, acc, steps in results if acc) / max(accepted_count, 1)
-                avg_steps_rejected = sum(steps for _, acc, steps in results if not acc) / max(rejected_count, 1)
-                
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.metric("⏱️ Promedio pasos (aceptadas)", f"{avg_steps_accepted:.1f}")
-                    
-                with col2:
-                    st.metric("⏱️ Promedio pasos (rechazadas)", f"{avg_steps_rejected:.1f}")
-                
-                st.markdown("### 📊 Tabla Resumen")
-                st.dataframe({
-                    "Cadena": [s for s, _, _ in results],
-                    "Estado": ["✅ Aceptada" if a else "❌ Rechazada" for _, a, _ in results],
-                    "Pasos": [steps for _, _, steps in results]
-                }, use_container_width=True)
-            else:
-                st.warning("No hay resultados de simulación para mostrar")
+            if tab4.open:
+                st.header("📈 Estadísticas de Simulación")
+
+                # Las estadísticas arrancan (o reutilizan) el mismo lote que la pestaña de simulación
+                job = None
+                if not strings_to_simulate or bad_custom:
+                    nd_stats = []
+                elif nondeterministic:
+                    nd_stats = [(s, nd.accepted, nd.depth) for s, nd in nondeterministic_results()]
+                else:
+                    job = simulation_job()
+                refresh = None if job is None or job.done else 0.5
+
+                @st.fragment(run_every=refresh)
+                def statistics_panel():
+                    if job is None:
+                        finished = []
+                        results = nd_stats
+                    else:
+                        finished = sorted(list(job.results), key=lambda r: r.index)
+                        results = [(r.input_string, r.accepted, r.steps) for r in finished]
+                    if results:
+                        if job is not None and not job.done:
+                            st.caption(f"⏳ Resultados parciales: {len(results)}/{len(job.strings)} cadenas")
+                        render_statistics(results)
+                        cut_time = [r.input_string for r in finished if r.cutoff in (CUTOFF_TIME, CUTOFF_DEADLINE)]
+                        cut_steps = [r.input_string for r in finished if r.cutoff == CUTOFF_STEPS]
+                        if cut_time or cut_steps:
+                            st.markdown("### ✂️ Cadenas cortadas")
+                            st.write(f"**Por tiempo:** {', '.join(f'`{x}`' for x in cut_time) or '—'}")
+                            st.write(f"**Por pasos:** {', '.join(f'`{x}`' for x in cut_steps) or '—'}")
+                    else:
+                        st.warning("No hay resultados de simulación para mostrar")
+
+                statistics_panel()
+
+                with st.expander("🔤 Lenguaje aceptado hasta longitud n"):
+                    n_max = st.number_input("Longitud máxima (n):", min_value=0, max_value=10, value=4)
+                    if st.button("Enumerar Σ^≤n"):
+                        memo = ConfigurationMemo()
+                        with st.spinner("Enumerando cadenas..."):
+                            summary = summarize_language(enumerate_language(tm, int(n_max), max_steps, memo=memo))
+                        col1, col2, col3 = st.columns(3)
+                        with col1:
+                            st.metric("📊 Cadenas", summary.accepted_count + summary.rejected_count)
+                        with col2:
+                            st.metric("✅ Aceptadas", summary.accepted_count)
+                        with col3:
+                            st.metric("❌ Rechazadas", summary.rejected_count)
+                        st.caption(f"Configuraciones reutilizadas entre entradas: {memo.hits}")
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            st.dataframe({"Aceptadas": [s or "ε" for s in summary.accepted]}, use_container_width=True)
+                        with col2:
+                            st.dataframe({"Rechazadas": [s or "ε" for s in summary.rejected]}, use_container_width=True)
+
+                with st.expander("📐 Perfil de complejidad (pasos y celdas por longitud)"):
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        prof_length = st.number_input("Longitud máxima (n):", min_value=2, max_value=200,
+                                                      value=12, key="prof_length")
+                    with col2:
+                        prof_sample = st.number_input("Cadenas por longitud (0 = todas):", 0, 100000, 200,
+                                                      key="prof_sample",
+                                                      help="Con 0, las longitudes con más de 4096 cadenas "
+                                                           "se muestrean con 4096 al azar")
+                    if st.button("Perfilar"):
+                        with st.spinner("Simulando por longitud..."):
+                            profile = profile_complexity(tm, int(prof_length), max_steps,
+                                                         sample=int(prof_sample) or None, seed=0)
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            st.metric("⏱️ Tiempo (peor caso)", profile.time.label if profile.time else "—")
+                        with col2:
+                            st.metric("🧮 Espacio (peor caso)", profile.space.label if profile.space else "—")
+                        chart = pd.DataFrame({
+                            "Pasos (máx)": [p.max_steps for p in profile.lengths],
+                            "Pasos (media)": [p.mean_steps for p in profile.lengths],
+                        }, index=pd.Index([p.length for p in profile.lengths], name="n"))
+                        if profile.time:
+                            chart[f"Ajuste {profile.time.label}"] = [profile.time(n) for n in chart.index]
+                        st.line_chart(chart)
+                        st.dataframe({
+                            "n": [p.length for p in profile.lengths],
+                            "Cadenas": [p.count for p in profile.lengths],
+                            "Pasos máx": [p.max_steps for p in profile.lengths],
+                            "Pasos media": [round(p.mean_steps, 1) for p in profile.lengths],
+                            "Celdas máx": [p.max_cells for p in profile.lengths],
+                            "Celdas media": [round(p.mean_cells, 1) for p in profile.lengths],
+                            "Cortadas": [p.cutoffs for p in profile.lengths],
+                        }, use_container_width=True)
+                        if any(p.cutoffs for p in profile.lengths):
+                            st.warning("⚠️ Hay cadenas cortadas por el máximo de pasos: el ajuste subestima el crecimiento.")
     
     except Exception as e:
+        cancel_session_job()
         st.error(f"❌ Error al procesar el YAML: {str(e)}")
         
         with st.expander("🐛 Ver detalles del error"):
@@ -1996,4 +6053,14 @@ simulation_strings:
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if sys.argv[1:2] == ["serve"]:
+        cli = argparse.ArgumentParser(prog="turing_simulator.py serve",
+                                      description="Servidor local HTTP/JSON de simulación")
+        cli.add_argument("--host", default="127.0.0.1")
+        cli.add_argument("--port", type=int, default=8765)
+        cli.add_argument("--workers", type=int, default=None, help="Procesos del pool (por defecto, uno por CPU)")
+        cli.add_argument("--timeout", type=float, default=60.0, help="Tiempo máximo por petición (s)")
+        args = cli.parse_args(sys.argv[2:])
+        SimulationServer(args.host, args.port, args.workers, args.timeout).serve_forever()
+    else:
+        main()
\ No newline at end of file